@@ -15,7 +15,8 @@ echo "There is no NAPPS_PATH specified. Default will be used."
 NAPPS_PATH=""
 fi
 # the settings below are intended to decrease the tests execution time (in fact, the time.sleep() calls
-# depend on the values below, otherwise many tests would fail)
+# depend on the values below, otherwise many tests would fail). They are the baseline: test classes can
+# run with other timers through the profiles of tests/timer_profiles.py (see --timer-profile)
 sed -i 's/STATS_INTERVAL = 60/STATS_INTERVAL = 7/g' $NAPPS_PATH/var/lib/kytos/napps/kytos/of_core/settings.py
 sed -i 's/CONSISTENCY_MIN_VERDICT_INTERVAL =.*/CONSISTENCY_MIN_VERDICT_INTERVAL = 60/g' $NAPPS_PATH/var/lib/kytos/napps/kytos/flow_manager/settings.py
 sed -i 's/LINK_UP_TIMER = 10/LINK_UP_TIMER = 1/g' $NAPPS_PATH/var/lib/kytos/napps/kytos/topology/settings.py
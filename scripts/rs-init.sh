@@ -70,5 +70,17 @@ napps.createUser(
     roles: [ { role: "dbAdmin", db: "napps" } ]
   }
 );
+// one database per pytest-xdist worker, see tests/workers.py
+var workers = parseInt(process.env["MONGO_XDIST_WORKERS"] || "0");
+for (var i = 0; i < workers; i++) {
+  worker_db = db.getSiblingDB("napps_gw" + i);
+  worker_db.createUser(
+    {
+      user: process.env["MONGO_USERNAME"],
+      pwd: process.env["MONGO_PASSWORD"],
+      roles: [ { role: "dbAdmin", db: "napps_gw" + i } ]
+    }
+  );
+}
 print("done all users have been created.");
 EOF
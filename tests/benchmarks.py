@@ -0,0 +1,139 @@
+"""Helpers of the benchmark modules.
+
+Tests marked with `benchmark` only run when --benchmark-dir is given; each
+benchmark saves its results as JSON in that directory.
+"""
+import json
+import math
+import os
+import re
+import threading
+import time
+
+PERCENTILES = (50, 90, 99)
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+# the generated flows are identified by the high byte of their cookies
+COOKIE_BASE = 0xbb00000000000000
+COOKIE_MASK = 0xff00000000000000
+
+FLOW_COUNT_RE = re.compile(r'flow_count=(\d+)')
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile of values, linearly interpolated."""
+    values = sorted(values)
+    if not values:
+        return None
+    rank = (len(values) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def summarize(values):
+    """Return the count, min, mean, max and percentiles of values."""
+    values = list(values)
+    if not values:
+        return {'count': 0}
+    summary = {
+        'count': len(values),
+        'min': min(values),
+        'mean': sum(values) / len(values),
+        'max': max(values),
+    }
+    for pct in PERCENTILES:
+        summary[f'p{pct}'] = percentile(values, pct)
+    return summary
+
+
+def write_results(directory, name, results):
+    """Save results as <directory>/<name>.json and return its path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{name}.json')
+    data = {'benchmark': name, 'timestamp': time.time(), 'results': results}
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def process_usage(pid):
+    """Return the resident memory (bytes) and the CPU time (user + system
+    seconds, all threads) of a process."""
+    with open(f'/proc/{pid}/stat', 'r') as f:
+        # fields after the command name, which may contain spaces
+        fields = f.read().rsplit(')', 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    rss = 0
+    with open(f'/proc/{pid}/status', 'r') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                rss = int(line.split()[1]) * 1024
+                break
+    return {'rss': rss, 'cpu': cpu}
+
+
+class ResourceSampler:
+    """Sample the memory and CPU usage of a process in the background.
+
+    Used as a context manager; `result()` returns the peak and final RSS and
+    the CPU seconds spent while it was running.
+    """
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def __enter__(self):
+        self.samples.append(process_usage(self.pid))
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.samples.append(process_usage(self.pid))
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.samples.append(process_usage(self.pid))
+            except FileNotFoundError:
+                return
+
+    def result(self):
+        return {
+            'rss_peak': max(sample['rss'] for sample in self.samples),
+            'rss_end': self.samples[-1]['rss'],
+            'cpu_seconds': self.samples[-1]['cpu'] - self.samples[0]['cpu'],
+        }
+
+
+def generate_flow(i):
+    """Return the i-th generated flow_manager flow, with a unique cookie
+    and match."""
+    return {
+        "cookie": COOKIE_BASE + i,
+        "priority": 100,
+        "match": {
+            "in_port": 1,
+            "dl_type": 2048,
+            "nw_dst": "10.%d.%d.%d" % ((i >> 16) & 255, (i >> 8) & 255, i & 255),
+        },
+        "actions": [{"action_type": "output", "port": 2}],
+    }
+
+
+def flow_count(sw, match):
+    """Return how many flows of the switch match, by `dump-aggregate`."""
+    match = FLOW_COUNT_RE.search(sw.dpctl('dump-aggregate', match))
+    return int(match.group(1)) if match else 0
+
+
+def installed_count(sw, cookie=COOKIE_BASE, mask=COOKIE_MASK):
+    """Return how many generated flows are installed on the switch."""
+    return flow_count(sw, 'cookie=%#x/%#x' % (cookie, mask))
@@ -1,16 +1,235 @@
+import json
 import pytest
 from datetime import datetime
 
+from tests.helpers import NETWORK_POOL
+from tests.scheduler import DurationScheduler
+from tests.sleep_profiler import SleepProfiler
+from tests.timer_profiles import PROFILES, TIMER_PROFILES
+from tests.workers import ISOLATED
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('e2e scheduling')
+    group.addoption(
+        '--durations-history', default='.e2e_durations.json',
+        help='file keeping the duration of each test phase across runs',
+    )
+    group.addoption(
+        '--num-shards', type=int, default=None,
+        help='split the modules in this number of shards balanced by duration',
+    )
+    group.addoption(
+        '--shard-id', type=int, default=0,
+        help='shard to run (0-based), used with --num-shards',
+    )
+    group = parser.getgroup('e2e timers')
+    group.addoption(
+        '--timer-profile', choices=sorted(PROFILES), default=None,
+        help='run every test class with this NApps timer profile, '
+             'overriding their timer_profile markers',
+    )
+    group = parser.getgroup('e2e benchmarks')
+    group.addoption(
+        '--benchmark-dir', metavar='DIR', default=None,
+        help='run the tests marked as benchmark, saving their results in DIR',
+    )
+    group = parser.getgroup('e2e profiling')
+    group.addoption(
+        '--profile-sleeps', metavar='PATH', default=None,
+        help='account the time blocked in sleeps, requests and mininet '
+             'commands per call site and save the ranking as JSON to PATH; '
+             'thread pools are accounted where Future.result waits, per '
+             'submitted callable',
+    )
+    group.addoption(
+        '--phase-timings', metavar='PATH', default=None,
+        help='save the setup/call/teardown timings of every test as JSON to PATH',
+    )
+    group.addoption(
+        '--slowest-phases', metavar='N', type=int, default=10,
+        help='show the N slowest test phases (0 to disable)',
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'readonly: the test does not change the kytos state, so the next '
+        'NetworkTest.restart_kytos_if_mutated() call can skip the restart',
+    )
+    config.addinivalue_line(
+        'markers',
+        'timer_profile(name): run the class with the NApps timers of the '
+        'named profile, see tests/timer_profiles.py',
+    )
+    config.addinivalue_line(
+        'markers', 'benchmark: only run with --benchmark-dir',
+    )
+    num_shards = config.getoption('num_shards')
+    shard_id = config.getoption('shard_id')
+    if num_shards and not 0 <= shard_id < num_shards:
+        raise pytest.UsageError('--shard-id must be in [0, --num-shards)')
+    config.pluginmanager.register(
+        DurationScheduler(config.getoption('durations_history'), shard_id, num_shards),
+        'duration-scheduler',
+    )
+    if config.getoption('profile_sleeps'):
+        config.pluginmanager.register(
+            SleepProfiler(config.getoption('profile_sleeps')), 'sleep-profiler'
+        )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('benchmark_dir'):
+        return
+    skip = pytest.mark.skip(reason='benchmark, use --benchmark-dir to run it')
+    for item in items:
+        if item.get_closest_marker('benchmark'):
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope='session')
+def benchmark_dir(request):
+    """Directory where the benchmarks save their results."""
+    return request.config.getoption('benchmark_dir')
+
+
+@pytest.fixture(scope='session', autouse=True)
+def network_pool():
+    """Mininet networks shared by the test classes during the session."""
+    yield NETWORK_POOL
+    NETWORK_POOL.stop_all()
+
+
+@pytest.fixture(scope='class', autouse=True)
+def class_network_pool(request, network_pool):
+    """Give the test class the network pool as `cls.network_pool`, for
+    its setup_class and teardown_class."""
+    if request.cls is not None:
+        request.cls.network_pool = network_pool
+    users = network_pool.users
+    yield network_pool
+    network_pool.forget_users(users)
+
+
+@pytest.fixture(scope='class', autouse=True)
+def timer_profile(request):
+    """Apply the timer profile of the class before it starts kytosd.
+
+    The NApps settings are shared by every kytosd of the host, so profiles
+    are not applied under pytest-xdist.
+    """
+    if ISOLATED:
+        yield None
+        return
+    name = request.config.getoption('timer_profile')
+    marker = request.node.get_closest_marker('timer_profile')
+    if name is None and marker is not None:
+        name = marker.args[0]
+    TIMER_PROFILES.select(name)
+    yield name
+
+
+def pytest_unconfigure(config):
+    TIMER_PROFILES.revert()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    # where the kytosd log of the test starts, see pytest_runtest_makereport
+    net = getattr(item.cls, 'net', None)
+    item.kytosd_log_mark = net.log_mark() if net is not None else None
+    yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    yield
+    net = getattr(item.cls, 'net', None)
+    if net is not None and item.get_closest_marker('readonly') is None:
+        net.mutated = True
+
+
+# timings of every phase (setup, call, teardown) of every test
+PHASE_TIMINGS = []
+
 
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call):
+    # exported as <properties> by --junitxml, which reads them from the
+    # teardown report: add them before the report copies them, once per
+    # phase even when the test is rerun
+    name = f'{call.when}_duration'
+    item.user_properties[:] = [prop for prop in item.user_properties if prop[0] != name]
+    item.user_properties.append((name, f'{call.duration:.6f}'))
     outcome = yield
     report = outcome.get_result()
     report.start = call.start
     report.stop = call.stop
+    net = getattr(item.cls, 'net', None)
+    if report.failed and net is not None:
+        # only kept when kytosd runs as a KytosController (KYTOSD_MANAGED)
+        lines = net.log_since(getattr(item, 'kytosd_log_mark', None))
+        if lines:
+            report.sections.append((f'Captured kytosd log {call.when}', '\n'.join(lines)))
+
+
+def pytest_runtest_logreport(report):
+    # also called on the xdist controller with the reports of the workers,
+    # which carry the start and stop times set above
+    PHASE_TIMINGS.append({
+        'nodeid': report.nodeid,
+        'when': report.when,
+        'start': report.start,
+        'stop': report.stop,
+        'duration': report.duration,
+        'outcome': report.outcome,
+    })
+
 
+# network pool stats of the xdist workers, received by the controller
+WORKER_POOL_STATS = []
+
+
+def pool_stats(pool):
+    return {'reuses': sum(pool.reuses.values()), 'time_saved': pool.time_saved}
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    stats = getattr(node, 'workeroutput', {}).get('network_pool')
+    if stats:
+        WORKER_POOL_STATS.append(stats)
+
+
+def pytest_sessionfinish(session):
+    if hasattr(session.config, 'workerinput'):
+        # xdist workers send their reports to the controller process, and
+        # their network pool stats along with the end of the session
+        session.config.workeroutput['network_pool'] = pool_stats(NETWORK_POOL)
+        return
+    path = session.config.getoption('phase_timings')
+    if path:
+        with open(path, 'w') as f:
+            json.dump(PHASE_TIMINGS, f, indent=1)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    slowest = config.getoption('slowest_phases')
+    if slowest and PHASE_TIMINGS:
+        terminalreporter.section(f'{slowest} slowest phases', sep='-', bold=True)
+        for timing in sorted(PHASE_TIMINGS, key=lambda t: -t['duration'])[:slowest]:
+            terminalreporter.write_line(
+                '{duration:10.2f}s {when:8} {nodeid}'.format(**timing)
+            )
+        totals = {}
+        for timing in PHASE_TIMINGS:
+            totals[timing['when']] = totals.get(timing['when'], 0) + timing['duration']
+        terminalreporter.write_line(
+            'total: ' + ', '.join(f'{when}: {total:.1f}s' for when, total in totals.items())
+        )
 
-def pytest_terminal_summary(terminalreporter):
     terminalreporter.ensure_newline()
     terminalreporter.section('start/stop times', sep='-', bold=True)
     for stat in terminalreporter.stats.values():
@@ -29,3 +248,12 @@ def pytest_terminal_summary(terminalreporter):
                 start = datetime.fromtimestamp(report.start)
                 stop = datetime.fromtimestamp(report.stop)
                 terminalreporter.write_line('{id:20}: {start:%Y-%m-%d,%H:%M:%S.%f} - {stop:%Y-%m-%d,%H:%M:%S.%f}'.format(id=report.nodeid, start=start, stop=stop))
+
+    stats = WORKER_POOL_STATS or [pool_stats(NETWORK_POOL)]
+    reuses = sum(stat['reuses'] for stat in stats)
+    if reuses:
+        terminalreporter.section('mininet network pool', sep='-', bold=True)
+        terminalreporter.write_line(
+            f"networks reused {reuses} times, setup time saved: "
+            f"{sum(stat['time_saved'] for stat in stats):.1f}s"
+        )
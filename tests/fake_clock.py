@@ -0,0 +1,60 @@
+"""Run kytosd under a controllable clock with libfaketime.
+
+kytosd is started with libfaketime preloaded and reading its time
+specification from a file, so the clock of the running controller can be
+sped up (e.g., 10x) from the tests. Scheduled EVCs and maintenance windows
+then start and end in seconds instead of minutes.
+"""
+import os
+import tempfile
+import time
+from datetime import datetime
+
+FAKETIME_LIB = os.environ.get(
+    'FAKETIME_LIB', '/usr/lib/x86_64-linux-gnu/faketime/libfaketimeMT.so.1'
+)
+
+
+class FakeClock:
+    """The clock of a kytosd process started with env()."""
+
+    def __init__(self, speed=1, lib=FAKETIME_LIB):
+        if not os.path.exists(lib):
+            raise Exception(f'libfaketime not found at {lib}, set FAKETIME_LIB')
+        self.lib = lib
+        self.speed = speed
+        self.started_at = None
+        fd, self.path = tempfile.mkstemp(prefix='kytosd-faketime-')
+        os.close(fd)
+        self._write()
+
+    def _write(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write('+0 x%g\n' % self.speed)
+        os.replace(tmp_path, self.path)
+
+    def env(self):
+        """Return the environment variables which apply the clock."""
+        preload = os.environ.get('LD_PRELOAD')
+        return {
+            'LD_PRELOAD': f'{self.lib}:{preload}' if preload else self.lib,
+            'FAKETIME_TIMESTAMP_FILE': self.path,
+        }
+
+    def start(self):
+        """Mark the start of the process, from which the speed applies."""
+        self.started_at = time.time()
+
+    def now(self):
+        """Return the current UTC time of the process clock."""
+        real = time.time()
+        started_at = self.started_at or real
+        return datetime.utcfromtimestamp(
+            started_at + (real - started_at) * self.speed
+        )
+
+    def close(self):
+        """Remove the file of the clock, once its process exited."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
@@ -0,0 +1,229 @@
+"""Compare the flows known by flow_manager with the flows of the switches.
+
+Both sides are canonicalized into hashable keys, (table, priority, match),
+with the cookie and the actions as value, so the diff of a switch is
+computed in O(n) with dict lookups: flows missing on the switch, extra flows
+on the switch and flows whose cookie or actions differ.
+"""
+import json
+from collections import namedtuple
+
+from tests.flows import parse_dump_flows
+
+DEFAULT_PRIORITY = 32768
+
+# OVS match shorthands and the fields they stand for
+SHORTHANDS = {
+    'ip': {'dl_type': 0x0800},
+    'ipv6': {'dl_type': 0x86dd},
+    'arp': {'dl_type': 0x0806},
+    'icmp': {'dl_type': 0x0800, 'nw_proto': 1},
+    'tcp': {'dl_type': 0x0800, 'nw_proto': 6},
+    'udp': {'dl_type': 0x0800, 'nw_proto': 17},
+    'sctp': {'dl_type': 0x0800, 'nw_proto': 132},
+    'icmp6': {'dl_type': 0x86dd, 'nw_proto': 58},
+    'tcp6': {'dl_type': 0x86dd, 'nw_proto': 6},
+    'udp6': {'dl_type': 0x86dd, 'nw_proto': 17},
+}
+# OVS names of the flow_manager match fields
+MATCH_FIELDS = {
+    'ipv4_src': 'nw_src',
+    'ipv4_dst': 'nw_dst',
+    'ip_proto': 'nw_proto',
+    'eth_type': 'dl_type',
+    'eth_src': 'dl_src',
+    'eth_dst': 'dl_dst',
+    'vlan_vid': 'dl_vlan',
+    'vlan_pcp': 'dl_vlan_pcp',
+}
+TAG_TYPES = {'s': 0x88a8, 'c': 0x8100}
+CONTROLLER_PORT = 0xfffffffd
+
+FlowKey = namedtuple('FlowKey', 'table priority match')
+
+
+class FlowDiff(namedtuple('FlowDiff', 'missing extra mismatched')):
+    """Diff of a switch: `missing` and `extra` hold FlowKeys, `mismatched`
+    (FlowKey, controller value, switch value) tuples."""
+
+    @property
+    def consistent(self):
+        return not (self.missing or self.extra or self.mismatched)
+
+
+def _value(value):
+    """Canonical match value: ints for numbers, no /32 on host addresses."""
+    if isinstance(value, str):
+        if value.endswith('/32') or value.endswith('/128'):
+            value = value.rsplit('/', 1)[0]
+        try:
+            return int(value, 0)
+        except ValueError:
+            return value.lower()
+    return value
+
+
+def _vlan_match(match, value):
+    """Translate a flow_manager dl_vlan to the way OVS prints it."""
+    if isinstance(value, str) and '/' in value:
+        vid, mask = (int(part) for part in value.split('/'))
+        match['vlan_tci'] = '%#06x/%#06x' % (vid | 0x1000 if vid else 0,
+                                             mask | 0x1000 if mask else 0)
+    elif value == 0:
+        match['vlan_tci'] = '0x0000'
+    else:
+        match['dl_vlan'] = int(value)
+
+
+def controller_match(match):
+    canonical = {}
+    for field, value in match.items():
+        field = MATCH_FIELDS.get(field, field)
+        if field == 'dl_vlan':
+            _vlan_match(canonical, value)
+        else:
+            canonical[field] = _value(value)
+    return frozenset(canonical.items())
+
+
+def switch_match(match):
+    canonical = {}
+    for field, value in match.items():
+        if value is None and field in SHORTHANDS:
+            canonical.update(SHORTHANDS[field])
+        elif field == 'vlan_tci' and isinstance(value, str):
+            canonical[field] = value.lower()
+        else:
+            canonical[field] = _value(value)
+    return frozenset(canonical.items())
+
+
+def controller_actions(flow):
+    """Return the canonical action list of a flow_manager flow."""
+    instructions = flow.get('instructions')
+    if instructions is None:
+        instructions = [{'instruction_type': 'apply_actions',
+                         'actions': flow.get('actions', [])}]
+    actions = []
+    for instruction in instructions:
+        kind = instruction.get('instruction_type')
+        if kind == 'goto_table':
+            actions.append(('goto_table', instruction['table_id']))
+            continue
+        if kind != 'apply_actions':
+            actions.append(('raw', json.dumps(instruction, sort_keys=True)))
+            continue
+        for action in instruction.get('actions', []):
+            action_type = action.get('action_type')
+            if action_type == 'output':
+                port = action['port']
+                if port in ('controller', CONTROLLER_PORT):
+                    actions.append(('controller',))
+                else:
+                    actions.append(('output', int(port)))
+            elif action_type == 'set_vlan':
+                actions.append(('set_vlan', int(action['vlan_id'])))
+            elif action_type == 'push_vlan':
+                actions.append(('push_vlan', TAG_TYPES.get(action.get('tag_type'), 0x8100)))
+            elif action_type == 'pop_vlan':
+                actions.append(('pop_vlan',))
+            elif action_type == 'set_queue':
+                actions.append(('set_queue', int(action['queue_id'])))
+            else:
+                actions.append(('raw', json.dumps(action, sort_keys=True)))
+    return tuple(actions)
+
+
+def _split_actions(text):
+    """Split an OVS action list on the commas outside parentheses."""
+    actions, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            actions.append(text[start:i])
+            start = i + 1
+    actions.append(text[start:])
+    return [action.strip() for action in actions if action.strip()]
+
+
+def switch_actions(text):
+    """Return the canonical action list of an OVS actions string."""
+    actions = []
+    for action in _split_actions(text):
+        name, _, arg = action.partition(':')
+        name = name.lower()
+        if name == 'output':
+            actions.append(('output', int(arg, 0)))
+        elif name.isdigit():
+            actions.append(('output', int(name)))
+        elif name == 'controller':
+            actions.append(('controller',))
+        elif name == 'mod_vlan_vid':
+            actions.append(('set_vlan', int(arg, 0)))
+        elif name == 'set_field' and arg.endswith('->vlan_vid'):
+            actions.append(('set_vlan', int(arg.split('->')[0], 0) & 0xfff))
+        elif name == 'push_vlan':
+            actions.append(('push_vlan', int(arg, 0)))
+        elif name in ('pop_vlan', 'strip_vlan'):
+            actions.append(('pop_vlan',))
+        elif name == 'set_queue':
+            actions.append(('set_queue', int(arg, 0)))
+        elif name == 'goto_table':
+            actions.append(('goto_table', int(arg, 0)))
+        elif name == 'drop':
+            continue
+        else:
+            actions.append(('raw', action))
+    return tuple(actions)
+
+
+def index_controller_flows(flows):
+    """Return {FlowKey: (cookie, actions)} of flow_manager flows."""
+    return {
+        FlowKey(flow.get('table_id', 0), flow.get('priority', DEFAULT_PRIORITY),
+                controller_match(flow.get('match', {}))):
+        (flow.get('cookie', 0), controller_actions(flow))
+        for flow in flows
+    }
+
+
+def index_switch_flows(table):
+    """Return {FlowKey: (cookie, actions)} of a FlowTable."""
+    return {
+        FlowKey(flow.table, flow.priority, switch_match(flow.match)):
+        (flow.cookie, switch_actions(flow.actions))
+        for flow in table
+    }
+
+
+def in_ranges(cookie, ranges):
+    return any(low <= cookie <= high for low, high in ranges)
+
+
+def diff_flows(controller_flows, switch_table, ignored_cookies=()):
+    """Diff the flow_manager flows of a switch with its FlowTable.
+
+    Flows whose cookie is in one of the (low, high) `ignored_cookies`
+    ranges are left out on both sides.
+    """
+    expected = index_controller_flows(controller_flows)
+    actual = index_switch_flows(switch_table)
+    if ignored_cookies:
+        expected = {k: v for k, v in expected.items() if not in_ranges(v[0], ignored_cookies)}
+        actual = {k: v for k, v in actual.items() if not in_ranges(v[0], ignored_cookies)}
+    missing = [key for key in expected if key not in actual]
+    extra = [key for key in actual if key not in expected]
+    mismatched = [
+        (key, value, actual[key])
+        for key, value in expected.items()
+        if key in actual and actual[key] != value
+    ]
+    return FlowDiff(missing, extra, mismatched)
+
+
+def dump_switch(switch):
+    """Dump the flows of a switch with port numbers instead of names."""
+    return parse_dump_flows(switch.dpctl('dump-flows', '--no-names'))
@@ -0,0 +1,221 @@
+"""Follow the flow tables of the switches with `ovs-ofctl monitor`.
+
+One `ovs-ofctl monitor <bridge> watch:` process per switch streams the
+initial flows and then every flow added, modified or deleted. The flows are
+kept in memory as they change, along with per-cookie counters, so tests can
+block until a predicate over those counters holds, without sleeping and
+dumping the whole tables again, and know when each flow showed up on the
+switch.
+"""
+import subprocess
+import threading
+import time
+from collections import Counter
+
+from tests.flows import FlowSnapshot, FlowTable, parse_flow
+from tests.workers import switch_name
+
+EVENTS = ('INITIAL', 'ADDED', 'MODIFIED', 'DELETED')
+
+
+def parse_event(line):
+    """Return (event, Flow) of a monitor output line, or None."""
+    line = line.strip()
+    if not line.startswith('event='):
+        return None
+    head, sep, actions = line.partition('actions=')
+    tokens = head.split()
+    event = tokens[0].split('=', 1)[1]
+    if event not in EVENTS:
+        return None
+    fields = [token for token in tokens[1:] if not token.startswith('reason=')]
+    flow = parse_flow(','.join(fields) + ' ' + sep + actions)
+    return event, flow
+
+
+def flow_key(flow):
+    """Identify a flow entry the way OpenFlow does: table, priority and
+    match."""
+    return flow.table, flow.priority, tuple(sorted(flow.match.items()))
+
+
+class FlowMonitor:
+    """Flow table of a switch, kept up to date by `ovs-ofctl monitor`."""
+
+    def __init__(self, switch, cond=None):
+        self.switch = switch
+        self.cond = cond or threading.Condition()
+        self.process = None
+        self.flows = {}
+        # flow key -> time.monotonic() of the ADDED event
+        self.added_at = {}
+        self.deleted = 0
+        # cookie -> flows on the switch, and cookie -> ADDED events
+        self.cookies = Counter()
+        self.additions = Counter()
+        self._thread = None
+
+    def start(self, timeout=5):
+        """Start monitoring and wait for the first output of the stream,
+        which `ovs-ofctl monitor` writes even for an empty flow table.
+
+        Raise an exception if it shows nothing within `timeout` seconds or
+        exits before any output.
+        """
+        if self.process is not None:
+            return self
+        self.process = subprocess.Popen(
+            ['ovs-ofctl', 'monitor', self.switch.name, 'watch:'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        )
+        self._first_line = threading.Event()
+        self._thread = threading.Thread(target=self._follow, daemon=True)
+        self._thread.start()
+        if not self._first_line.wait(timeout) or self.process.poll() is not None:
+            code = self.process.poll()
+            self.stop()
+            raise Exception(f'ovs-ofctl monitor {self.switch.name} had no '
+                            f'output after {timeout}s (exit code: {code})')
+        return self
+
+    def _follow(self):
+        for line in self.process.stdout:
+            self._first_line.set()
+            parsed = parse_event(line)
+            if parsed is None:
+                continue
+            event, flow = parsed
+            key = flow_key(flow)
+            with self.cond:
+                old = self.flows.pop(key, None)
+                if old is not None:
+                    self.cookies[old.cookie] -= 1
+                    if not self.cookies[old.cookie]:
+                        del self.cookies[old.cookie]
+                if event == 'DELETED':
+                    self.added_at.pop(key, None)
+                    self.deleted += 1
+                else:
+                    self.flows[key] = flow
+                    self.cookies[flow.cookie] += 1
+                    if event == 'ADDED':
+                        self.added_at[key] = time.monotonic()
+                        self.additions[flow.cookie] += 1
+                self.cond.notify_all()
+        self._first_line.set()
+
+    def count(self, cookie=None):
+        """Return how many flows the switch has, with `cookie` if given."""
+        with self.cond:
+            return len(self.flows) if cookie is None else self.cookies[cookie]
+
+    def table(self):
+        """Return the current flows as a FlowTable."""
+        with self.cond:
+            return FlowTable(list(self.flows.values()))
+
+    def install_latency(self, since, cookie=None):
+        """Return {flow key: seconds from `since` (a time.monotonic()
+        value) to the ADDED event} of the flows added after `since`."""
+        with self.cond:
+            return {
+                key: added_at - since
+                for key, added_at in self.added_at.items()
+                if added_at >= since
+                and (cookie is None or self.flows[key].cookie == cookie)
+            }
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait()
+        if self._thread:
+            self._thread.join(timeout=1)
+
+
+class FabricMonitor:
+    """FlowMonitors of several switches sharing one condition variable."""
+
+    def __init__(self, switches):
+        self.cond = threading.Condition()
+        self.monitors = {sw.name: FlowMonitor(sw, self.cond) for sw in switches}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        try:
+            for monitor in self.monitors.values():
+                monitor.start()
+        except Exception:
+            self.stop()
+            raise
+        return self
+
+    def stop(self):
+        for monitor in self.monitors.values():
+            monitor.stop()
+
+    def monitor(self, name):
+        """Return the FlowMonitor of a switch, by its topology name too."""
+        if name in self.monitors:
+            return self.monitors[name]
+        return self.monitors[switch_name(name)]
+
+    def _selected(self, switch):
+        if switch is None:
+            return list(self.monitors.values())
+        return [self.monitor(switch)]
+
+    def count(self, switch=None, cookie=None):
+        """Return how many flows the switch, or all of them, have, with
+        `cookie` if given. Kept up to date as events arrive, so it costs no
+        scan of the flows."""
+        return sum(monitor.count(cookie) for monitor in self._selected(switch))
+
+    def additions(self, switch=None, cookie=None):
+        """Return how many ADDED events the switch, or all of them, had for
+        flows with `cookie` (or any cookie)."""
+        with self.cond:
+            return sum(
+                sum(monitor.additions.values()) if cookie is None
+                else monitor.additions[cookie]
+                for monitor in self._selected(switch)
+            )
+
+    def snapshot(self):
+        """Return the current flows of every switch as a FlowSnapshot."""
+        return FlowSnapshot(
+            (name, monitor.table()) for name, monitor in self.monitors.items()
+        )
+
+    def wait_until(self, predicate, timeout=30, msg=None):
+        """Block until predicate(monitor) is truthy and return its value.
+
+        The predicate is evaluated again whenever a flow changes on any of
+        the switches, so it should stick to count() and additions(), which
+        are O(1), rather than snapshot(), which copies every flow.
+        """
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while True:
+                result = predicate(self)
+                if result:
+                    return result
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    msg = msg or getattr(predicate, '__name__', repr(predicate))
+                    raise Exception('Timeout: timed out after %ss waiting for %s'
+                                    % (timeout, msg))
+                self.cond.wait(remaining)
+
+    def install_latency(self, since, cookie=None):
+        """Return {switch name: {flow key: seconds}}, see
+        FlowMonitor.install_latency()."""
+        return {name: monitor.install_latency(since, cookie)
+                for name, monitor in self.monitors.items()}
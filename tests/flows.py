@@ -0,0 +1,188 @@
+"""Parse `ovs-ofctl dump-flows` output into indexed flow records.
+
+Assertions can then look flows up by cookie, table, VLAN or in_port in
+constant time instead of scanning the whole dump text for each check:
+
+    flows = parse_dump_flows(s1.dpctl('dump-flows'))
+    assert len(flows.by_cookie(evc_cookie(evc_id))) == 3
+    assert flows.by_vlan(101)
+"""
+import time
+from collections import defaultdict, namedtuple
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from tests.workers import switch_name
+
+# fields of a dump-flows line which are not part of the match
+COUNTERS = ('duration', 'n_packets', 'n_bytes', 'idle_age', 'hard_age')
+OPTIONS = ('cookie', 'table', 'priority', 'idle_timeout', 'hard_timeout',
+           'importance', 'send_flow_rem', 'check_overlap', 'reset_counts',
+           'no_packet_counts', 'no_byte_counts', 'out_port', 'out_group')
+
+DEFAULT_PRIORITY = 32768
+
+# high byte of the cookies of the flows installed by mef_eline
+EVC_COOKIE_PREFIX = 0xaa
+
+Flow = namedtuple('Flow', 'table priority cookie match actions counters')
+Flow.__doc__ = 'A flow entry of a dump-flows output.'
+
+
+def evc_cookie(evc_id):
+    """Return the cookie of the flows of a mef_eline EVC."""
+    return int('%x%s' % (EVC_COOKIE_PREFIX, evc_id), 16)
+
+
+def _split_fields(text):
+    """Split on the commas and spaces which are not inside quotes or
+    brackets; OVS separates the flow flags (e.g., send_flow_rem) from the
+    next field with a space only."""
+    fields, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+        elif char in ', ' and depth == 0:
+            fields.append(text[start:i])
+            start = i + 1
+    fields.append(text[start:])
+    return [field.strip() for field in fields if field.strip()]
+
+
+def _number(value):
+    """Return value as int or float when it is a number."""
+    try:
+        return int(value, 0)
+    except ValueError:
+        pass
+    try:
+        return float(value.rstrip('s'))
+    except ValueError:
+        return value.strip('"')
+
+
+def parse_flow(line):
+    """Return the Flow of a dump-flows line, or None if it isn't a flow."""
+    head, sep, actions = line.strip().partition('actions=')
+    if not sep:
+        return None
+    table, priority, cookie = 0, DEFAULT_PRIORITY, 0
+    match, counters = {}, {}
+    for field in _split_fields(head):
+        key, _, value = field.partition('=')
+        if key in COUNTERS:
+            counters[key] = _number(value)
+        elif key == 'cookie':
+            cookie = int(value.split('/')[0], 16)
+        elif key == 'table':
+            table = _number(value)
+        elif key == 'priority':
+            priority = int(value)
+        elif key in OPTIONS:
+            continue
+        else:
+            # bare protocol names (e.g., "ip", "arp") have no value
+            match[key] = _number(value) if value else None
+    return Flow(table, priority, cookie, match, actions.strip(), counters)
+
+
+def _vlan(match):
+    vlan = match.get('dl_vlan', match.get('vlan_vid'))
+    return vlan if isinstance(vlan, int) else None
+
+
+def _freeze(index):
+    return {key: tuple(flows) for key, flows in index.items()}
+
+
+class FlowTable:
+    """Flows of one switch, indexed by cookie, table, VLAN and in_port.
+
+    `output` keeps the dump text, e.g. for assertion messages.
+    """
+
+    def __init__(self, flows, output=None):
+        self.flows = tuple(flows)
+        self.output = output
+        cookies = defaultdict(list)
+        tables = defaultdict(list)
+        vlans = defaultdict(list)
+        in_ports = defaultdict(list)
+        for flow in self.flows:
+            cookies[flow.cookie].append(flow)
+            tables[flow.table].append(flow)
+            vlan = _vlan(flow.match)
+            if vlan is not None:
+                vlans[vlan].append(flow)
+            if 'in_port' in flow.match:
+                in_ports[flow.match['in_port']].append(flow)
+        self._cookies = _freeze(cookies)
+        self._tables = _freeze(tables)
+        self._vlans = _freeze(vlans)
+        self._in_ports = _freeze(in_ports)
+
+    def __len__(self):
+        return len(self.flows)
+
+    def __iter__(self):
+        return iter(self.flows)
+
+    def by_cookie(self, cookie):
+        return self._cookies.get(cookie, ())
+
+    def by_table(self, table):
+        return self._tables.get(table, ())
+
+    def by_vlan(self, vlan):
+        return self._vlans.get(vlan, ())
+
+    def by_in_port(self, in_port):
+        return self._in_ports.get(in_port, ())
+
+    def cookies(self):
+        return set(self._cookies)
+
+
+def parse_dump_flows(output):
+    """Return the FlowTable of a `dump-flows` output."""
+    return FlowTable(filter(None, map(parse_flow, output.splitlines())), output)
+
+
+class FlowSnapshot(Mapping):
+    """Read-only FlowTables of several switches, keyed by switch name,
+    dumped at about the same time (`taken_at`, a time.time() value).
+
+    Tables can also be looked up by topology name, without the worker
+    prefix of the switches.
+    """
+
+    def __init__(self, tables, taken_at=None, duration=None):
+        self._tables = MappingProxyType(dict(tables))
+        self.taken_at = time.time() if taken_at is None else taken_at
+        # seconds spent dumping the switches
+        self.duration = duration
+
+    def __getitem__(self, name):
+        if name not in self._tables:
+            name = switch_name(name)
+        return self._tables[name]
+
+    def __iter__(self):
+        return iter(self._tables)
+
+    def __len__(self):
+        return len(self._tables)
+
+    def by_cookie(self, cookie):
+        """Return {switch name: flows} of the switches having the cookie."""
+        return {name: table.by_cookie(cookie)
+                for name, table in self._tables.items() if table.by_cookie(cookie)}
+
+    def total(self):
+        return sum(len(table) for table in self._tables.values())
@@ -1,33 +1,161 @@
 from mininet.net import Mininet
 from mininet.topo import Topo, LinearTopo
 from mininet.node import RemoteController, OVSSwitch
+from mininet.util import quietRun
 import mininet.clean
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from mock import patch
+import hashlib
+import json
 import time
 import os
+import re
+import select
+import shlex
+import signal
+import subprocess
+import tempfile
+import threading
 import requests
 
 from pymongo import MongoClient
 from pymongo.errors import ServerSelectionTimeoutError
 
+from tests.fake_clock import FakeClock
+from tests.flow_consistency import diff_flows, dump_switch
+from tests.flow_monitor import FabricMonitor
+from tests.flows import FlowSnapshot, parse_dump_flows
+from tests.waiters import dpid_from_switch, wait_topology_ready, wait_until
+from tests.workers import (IFNAME_MAX, ISOLATED, KYTOS_API, MONGO_DBNAME, OF_PORT,
+                           SWITCH_PREFIX, kytosd_args, kytosd_env, listen_port,
+                           pid_path, switch_name)
+
 BASE_ENV = os.environ.get('VIRTUAL_ENV', None) or '/'
 
-class AmlightTopo(Topo):
+# GET endpoints answering once a NApp is ready to serve requests; NApps not
+# listed here are considered ready as soon as they show up as enabled
+NAPP_READY_ENDPOINTS = {
+    'kytos/topology': '/topology/v3/',
+    'kytos/of_lldp': '/of_lldp/v1/polling_time',
+    'kytos/flow_manager': '/flow_manager/v2/flows',
+    'kytos/mef_eline': '/mef_eline/v2/evc/',
+    'kytos/maintenance': '/maintenance/v1',
+}
+
+# GET endpoints whose content makes up the controller state fingerprint
+STATE_ENDPOINTS = (
+    '/topology/v3/',
+    '/mef_eline/v2/evc/',
+    '/flow_manager/v2/flows',
+)
+# keys which change by themselves, without any request to the controller
+VOLATILE_KEYS = {'updated_at', 'last_status_change', 'stats', 'duration_sec',
+                 'duration_nsec', 'packet_count', 'byte_count'}
+
+
+def default_dpid(name):
+    """Return the dpid mininet derives from a switch name: its first
+    number, in hex."""
+    nums = re.findall(r'\d+', name)
+    if not nums:
+        raise Exception(f'Unable to derive default datapath ID from {name}')
+    return '%x' % int(nums[0])
+
+
+class WorkerTopo(Topo):
+    """Topology whose switches are named after the pytest-xdist worker, so
+    the workers can build it at the same time. The dpids stay the ones of
+    the unprefixed names."""
+
+    def addSwitch(self, name, **opts):
+        if ISOLATED:
+            opts.setdefault('dpid', default_dpid(name))
+            name = switch_name(name)
+        return super().addSwitch(name, **opts)
+
+    def addLink(self, node1, node2, port1=None, port2=None, key=None, **opts):
+        key = super().addLink(node1, node2, port1, port2, key=key, **opts)
+        info = self.linkInfo(node1, node2, key)
+        for node, port in ((info['node1'], info['port1']), (info['node2'], info['port2'])):
+            name = f'{node}-eth{port}'
+            if len(name) > IFNAME_MAX:
+                raise Exception(f'Interface name {name} is longer than '
+                                f'{IFNAME_MAX} characters')
+        return key
+
+
+class WorkerLinearTopo(WorkerTopo, LinearTopo):
+    """LinearTopo with worker switch names."""
+
+
+class WorkerSwitch(OVSSwitch):
+    """OVSSwitch showing the unprefixed port names on dpctl outputs, so
+    tests can look for in_port="s1-eth1" on any worker."""
+
+    def dpctl(self, *args):
+        output = super().dpctl(*args)
+        if ISOLATED:
+            output = output.replace('"' + SWITCH_PREFIX, '"')
+        return output
+
+
+class WorkerMininet(Mininet):
+    """Mininet looking up the switches by their unprefixed names too."""
+
+    def _node_name(self, name):
+        if isinstance(name, str) and name not in self.nameToNode:
+            return switch_name(name)
+        return name
+
+    def getNodeByName(self, *args):
+        return super().getNodeByName(*map(self._node_name, args))
+
+    def __getitem__(self, key):
+        return super().__getitem__(self._node_name(key))
+
+    def __contains__(self, item):
+        return super().__contains__(self._node_name(item))
+
+    def configLinkStatus(self, src, dst, status):
+        return super().configLinkStatus(self._node_name(src),
+                                        self._node_name(dst), status)
+
+
+def cleanup_worker():
+    """Remove the switches and switch interfaces left by a previous run of
+    this pytest-xdist worker, leaving the other workers' ones alone."""
+    bridges = [name for name in quietRun('ovs-vsctl list-br').split()
+               if name.startswith(SWITCH_PREFIX)]
+    if bridges:
+        quietRun('ovs-vsctl ' + ' '.join(f'-- --if-exists del-br {name}'
+                                         for name in bridges))
+    for line in quietRun('ip -o link show').splitlines():
+        fields = line.split(': ')
+        if len(fields) < 2:
+            continue
+        name = fields[1].split('@')[0]
+        if name.startswith(SWITCH_PREFIX) and '-eth' in name:
+            quietRun(f'ip link del {name}')
+
+
+class AmlightTopo(WorkerTopo):
     """Amlight Topology."""
     def build(self):
         # Add switches
-        self.Ampath1 = self.addSwitch('Ampath1', listenPort=6601, dpid='0000000000000011')
-        self.Ampath2 = self.addSwitch('Ampath2', listenPort=6602, dpid='0000000000000012')
-        SouthernLight2 = self.addSwitch('SoL2', listenPort=6603, dpid='0000000000000013')
-        SanJuan = self.addSwitch('SanJuan', listenPort=6604, dpid='0000000000000014')
-        AndesLight2 = self.addSwitch('AL2', listenPort=6605, dpid='0000000000000015')
-        AndesLight3 = self.addSwitch('AL3', listenPort=6606, dpid='0000000000000016')
-        self.Ampath3 = self.addSwitch('Ampath3', listenPort=6608, dpid='0000000000000017')
-        self.Ampath4 = self.addSwitch('Ampath4', listenPort=6609, dpid='0000000000000018')
-        self.Ampath5 = self.addSwitch('Ampath5', listenPort=6610, dpid='0000000000000019')
-        self.Ampath7 = self.addSwitch('Ampath7', listenPort=6611, dpid='0000000000000020')
-        JAX1 = self.addSwitch('JAX1', listenPort=6612, dpid='0000000000000021')
-        JAX2 = self.addSwitch('JAX2', listenPort=6613, dpid='0000000000000022')
+        self.Ampath1 = self.addSwitch('Ampath1', listenPort=listen_port(6601), dpid='0000000000000011')
+        self.Ampath2 = self.addSwitch('Ampath2', listenPort=listen_port(6602), dpid='0000000000000012')
+        SouthernLight2 = self.addSwitch('SoL2', listenPort=listen_port(6603), dpid='0000000000000013')
+        SanJuan = self.addSwitch('SanJuan', listenPort=listen_port(6604), dpid='0000000000000014')
+        AndesLight2 = self.addSwitch('AL2', listenPort=listen_port(6605), dpid='0000000000000015')
+        AndesLight3 = self.addSwitch('AL3', listenPort=listen_port(6606), dpid='0000000000000016')
+        self.Ampath3 = self.addSwitch('Ampath3', listenPort=listen_port(6608), dpid='0000000000000017')
+        self.Ampath4 = self.addSwitch('Ampath4', listenPort=listen_port(6609), dpid='0000000000000018')
+        self.Ampath5 = self.addSwitch('Ampath5', listenPort=listen_port(6610), dpid='0000000000000019')
+        self.Ampath7 = self.addSwitch('Ampath7', listenPort=listen_port(6611), dpid='0000000000000020')
+        JAX1 = self.addSwitch('JAX1', listenPort=listen_port(6612), dpid='0000000000000021')
+        JAX2 = self.addSwitch('JAX2', listenPort=listen_port(6613), dpid='0000000000000022')
         # add hosts
         h1 = self.addHost('h1', mac='00:00:00:00:00:01')
         h2 = self.addHost('h2', mac='00:00:00:00:00:02')
@@ -90,7 +218,7 @@ class AmlightLoopedTopo(AmlightTopo):
         self.addLink(self.Ampath4, self.Ampath4, port1=9, port2=10)
 
         
-class RingTopo(Topo):
+class RingTopo(WorkerTopo):
     """Ring topology with three switches
     and one host connected to each switch"""
 
@@ -118,15 +246,15 @@ class RingTopo(Topo):
         self.addLink(s3, s1)
 
 
-class Ring4Topo(Topo):
+class Ring4Topo(WorkerTopo):
     """Create a network from semi-scratch with multiple controllers."""
 
     def build(self):
         # ("*** Creating switches\n")
-        s1 = self.addSwitch('s1', listenPort=6601, dpid="1")
-        s2 = self.addSwitch('s2', listenPort=6602, dpid="2")
-        s3 = self.addSwitch('s3', listenPort=6603, dpid="3")
-        s4 = self.addSwitch('s4', listenPort=6604, dpid="4")
+        s1 = self.addSwitch('s1', listenPort=listen_port(6601), dpid="1")
+        s2 = self.addSwitch('s2', listenPort=listen_port(6602), dpid="2")
+        s3 = self.addSwitch('s3', listenPort=listen_port(6603), dpid="3")
+        s4 = self.addSwitch('s4', listenPort=listen_port(6604), dpid="4")
 
         # ("*** Creating hosts\n")
         hosts1 = [self.addHost('h%d' % n) for n in (1, 2)]
@@ -151,7 +279,7 @@ class Ring4Topo(Topo):
         self.addLink(s3, s4)
         self.addLink(s4, s1)
 
-class Looped(Topo):
+class Looped(WorkerTopo):
     """ Network with two switches
     and a loop in one switch."""
 
@@ -165,7 +293,7 @@ class Looped(Topo):
         self.addLink(s1, s1, port1=4, port2=5)
         self.addLink(s1, s2, port1=3, port2=1)
 
-class MultiConnectedTopo(Topo):
+class MultiConnectedTopo(WorkerTopo):
     """Multiply connected network topology six
     and one host connected to each switch """
     def build(self):
@@ -209,7 +337,7 @@ topos = {
     'ring4': (lambda: Ring4Topo()),
     'amlight': (lambda: AmlightTopo()),
     'amlight_looped': (lambda: AmlightLoopedTopo()),
-    'linear10': (lambda: LinearTopo(10)),
+    'linear10': (lambda: WorkerLinearTopo(10)),
     'multi': (lambda: MultiConnectedTopo()),
     'looped': (lambda: Looped()),
 }
@@ -244,6 +372,120 @@ def mongo_client(
     )
 
 
+class KytosController:
+    """Run kytosd in foreground as a subprocess and follow its log stream.
+
+    stdout and stderr are read by background threads, so readiness is
+    detected as soon as the "running" line and the "loaded" line of every
+    requested NApp show up, and the controller log of a test can be taken
+    from memory instead of rereading syslog. Only the last LOG_MAX_LINES
+    lines are kept.
+    """
+
+    RUNNING_RE = re.compile(r'kytos.*\brunning\b', re.I)
+    NAPP_LOADED_RE = re.compile(r'\bnapp\b.*\bloaded\b|\bloaded\b.*\bnapp\b',
+                                re.I)
+    # the NApp id ("username/napp_name") right after the word "NApp"
+    NAPP_ID_RE = re.compile(r'\bNApp:?\s+([a-z][a-z0-9_]*/[a-z][a-z0-9_]*)\b', re.I)
+    LOG_MAX_LINES = 10000
+
+    def __init__(self, napps=()):
+        self.napps = set(napps)
+        self.process = None
+        self.started_at = None
+        self.running_at = None
+        self.napps_loaded_at = {}
+        self.log_lines = deque(maxlen=self.LOG_MAX_LINES)
+        # lines read since start(), including the ones dropped from log_lines
+        self.lines_read = 0
+        self._cond = threading.Condition()
+        self._threads = []
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    def start(self, args, env=None):
+        """Start kytosd with the given command line arguments."""
+        self.log_lines.clear()
+        self.lines_read = 0
+        self.napps_loaded_at = {}
+        self.running_at = None
+        self.started_at = time.monotonic()
+        self.process = subprocess.Popen(
+            ['kytosd', '-f'] + list(args),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            env=env or kytosd_env(),
+        )
+        self._threads = [
+            threading.Thread(target=self._tail, args=(stream, name),
+                             daemon=True)
+            for stream, name in ((self.process.stdout, 'stdout'),
+                                 (self.process.stderr, 'stderr'))
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self.process
+
+    def _tail(self, stream, name):
+        for line in iter(stream.readline, ''):
+            now = time.monotonic()
+            with self._cond:
+                self.log_lines.append((now, name, line.rstrip('\n')))
+                self.lines_read += 1
+                if self.NAPP_LOADED_RE.search(line):
+                    for napp in self.NAPP_ID_RE.findall(line):
+                        self.napps_loaded_at.setdefault(napp, now)
+                if self.running_at is None and self.RUNNING_RE.search(line):
+                    self.running_at = now
+                self._cond.notify_all()
+        with self._cond:
+            self._cond.notify_all()
+
+    def is_ready(self):
+        return (self.running_at is not None
+                and self.napps.issubset(self.napps_loaded_at))
+
+    def wait_ready(self, timeout=60):
+        """Block until kytosd is running with all requested NApps loaded.
+
+        Return the load time of each NApp, in seconds since start().
+        """
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self.is_ready() or self.process.poll() is not None,
+                timeout=timeout)
+        if not ready or not self.is_ready():
+            missing = self.napps - set(self.napps_loaded_at)
+            raise Exception('Timeout while starting Kytos controller. '
+                            'Exit code: %s, NApps not loaded: %s'
+                            % (self.process.poll(), sorted(missing)))
+        return self.napp_load_times()
+
+    def napp_load_times(self):
+        return {napp: loaded_at - self.started_at
+                for napp, loaded_at in self.napps_loaded_at.items()}
+
+    def log_mark(self):
+        """Return the number of lines read so far, for log_since()."""
+        with self._cond:
+            return self.lines_read
+
+    def log_since(self, mark=0):
+        """Return the log lines still kept which were read after the
+        log_mark() `mark`."""
+        with self._cond:
+            dropped = self.lines_read - len(self.log_lines)
+            start = max(mark - dropped, 0)
+            return [line for _, _, line in list(self.log_lines)[start:]]
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+
 class NetworkTest:
     def __init__(
         self,
@@ -252,126 +494,748 @@ class NetworkTest:
         db_client=mongo_client,
         db_client_options=None,
     ):
-        # Create an instance of our topology
-        mininet.clean.cleanup()
+        # Create an instance of our topology. Mininet names are global to
+        # the host, so a cleanup would also remove the networks of other
+        # pytest-xdist workers
+        if ISOLATED:
+            cleanup_worker()
+        else:
+            mininet.clean.cleanup()
 
         # Create a network based on the topology using
         # OVS and controlled by a remote controller
         patch('mininet.util.fixLimits', side_effect=None)
-        self.net = Mininet(
+        self.net = WorkerMininet(
             topo=topos.get(topo_name, (lambda: RingTopo()))(),
             controller=lambda name: RemoteController(
-                name, ip=controller_ip, port=6653),
-            switch=OVSSwitch,
+                name, ip=controller_ip, port=OF_PORT),
+            switch=WorkerSwitch,
             autoSetMacs=True)
-        db_client_kwargs = db_client_options or {}
-        db_name = db_client_kwargs.get("database") or os.environ.get("MONGO_DBNAME")
+        db_client_kwargs = dict(db_client_options or {})
+        db_client_kwargs.setdefault("database", MONGO_DBNAME)
+        db_name = db_client_kwargs["database"]
         self.db_client = db_client(**db_client_kwargs)
         self.db_name = db_name
         self.db = self.db_client[self.db_name]
+        self.controller_stop_times = []
+        self.controller = None
+        self.started = False
+        self.switch_connect_latency = {}
+        self.controller_start_report = None
+        self.db_snapshot = None
+        self.flows_checkpoint = None
+        self.clock = None
+        # set whenever kytos may have left its initial state; the
+        # `readonly` marker keeps a test from setting it
+        self.mutated = True
+        self.pristine = None
+        # (controller ip, arguments) the NetworkPool built it with
+        self.pool_args = None
 
     def start(self):
-        self.net.start()
+        if not self.started:
+            self.net.start()
+            self.started = True
         self.start_controller(clean_config=True)
 
     def drop_database(self):
         """Drop database."""
         self.db_client.drop_database(self.db_name)
 
+    def snapshot_database(self):
+        """Keep a copy of every collection of the database in memory."""
+        self.db_snapshot = {
+            name: list(self.db[name].find())
+            for name in self.db.list_collection_names()
+        }
+        return self.db_snapshot
+
+    def restore_database(self):
+        """Restore the database to the last snapshot.
+
+        Documents are replaced with delete_many/insert_many per collection,
+        so collections and indexes don't need to be recreated.
+        """
+        for name in self.db.list_collection_names():
+            if name not in self.db_snapshot:
+                self.db[name].delete_many({})
+        for name, documents in self.db_snapshot.items():
+            self.db[name].delete_many({})
+            if documents:
+                self.db[name].insert_many(documents)
+
+    def flow_snapshot(self, switches=None, max_workers=16):
+        """Dump and parse the flows of the switches (all by default, or the
+        given names or nodes) concurrently and return a FlowSnapshot."""
+        if switches is None:
+            switches = self.net.switches
+        switches = [self.net.get(sw) if isinstance(sw, str) else sw
+                    for sw in switches]
+
+        def dump(sw):
+            return sw.name, parse_dump_flows(sw.dpctl('dump-flows'))
+
+        taken_at, start = time.time(), time.monotonic()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            tables = list(executor.map(dump, switches))
+        return FlowSnapshot(tables, taken_at, time.monotonic() - start)
+
+    def flow_consistency(self, switches=None, ignored_cookies=(), max_workers=16):
+        """Diff the flows flow_manager stored as installed with the flows
+        installed on the switches (all by default, or the given names or
+        nodes).
+
+        The stored flows come from /v2/stored_flows, what flow_manager
+        intends the switch to have; /v2/flows only reflects what the switch
+        reports. The switches are checked concurrently. Return
+        {switch name: FlowDiff}, see tests/flow_consistency.py.
+        """
+        if switches is None:
+            switches = self.net.switches
+        switches = [self.net.get(sw) if isinstance(sw, str) else sw
+                    for sw in switches]
+
+        def check(sw):
+            dpid = dpid_from_switch(sw)
+            response = requests.get(
+                f'{KYTOS_API}/flow_manager/v2/stored_flows?state=installed&dpid={dpid}'
+            )
+            assert response.status_code == 200, response.text
+            flows = [stored['flow'] for stored in response.json().get(dpid, [])]
+            return sw.name, diff_flows(flows, dump_switch(sw), ignored_cookies)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(executor.map(check, switches))
+
+    def monitor_flows(self, switches=None):
+        """Return a started FabricMonitor following the flows of the
+        switches (all by default, or the given names or nodes).
+
+        Use it as a context manager so the monitors are stopped.
+        """
+        if switches is None:
+            switches = self.net.switches
+        switches = [self.net.get(sw) if isinstance(sw, str) else sw
+                    for sw in switches]
+        return FabricMonitor(switches).start()
+
+    def checkpoint_flows(self, max_workers=16):
+        """Keep the flow tables of every switch in memory, concurrently."""
+        def dump(sw):
+            flows = sw.dpctl('dump-flows', '--no-stats').strip().splitlines()
+            # skip the "NXST_FLOW reply" header
+            return sw.name, [flow.strip() for flow in flows if 'actions=' in flow]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            self.flows_checkpoint = dict(executor.map(dump, self.net.switches))
+        return self.flows_checkpoint
+
+    def restore_flows(self, max_workers=16):
+        """Replace the flow tables of every switch by the last checkpoint.
+
+        Each switch is updated with a single `replace-flows --bundle`, which
+        only sends the differences and applies them atomically (OpenFlow 1.4
+        bundles); switches are updated concurrently.
+        """
+        def replace(sw):
+            with tempfile.NamedTemporaryFile('w', suffix='.flows', delete=False) as f:
+                f.write('\n'.join(self.flows_checkpoint[sw.name]) + '\n')
+            try:
+                result = sw.dpctl('replace-flows', '--bundle', f.name)
+            finally:
+                os.unlink(f.name)
+            if result.strip():
+                raise Exception(f'Failed to restore the flows of {sw.name}: '
+                                f'{result.strip()}')
+
+        switches = [sw for sw in self.net.switches if sw.name in self.flows_checkpoint]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(replace, switches))
+
+    def controller_pid(self):
+        """Return the pid of the running kytosd, or None."""
+        if self.controller is not None and self.controller.is_running():
+            return self.controller.pid
+        try:
+            with open(pid_path(BASE_ENV), "r") as f:
+                return int(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def stop_controller(self, timeout=float(os.environ.get("KYTOSD_STOP_TIMEOUT", 5)),
+                        interval=0.05):
+        """Stop kytosd sending SIGTERM to the pid found on its pid file.
+
+        The process is polled until it exits; SIGKILL is only sent if it is
+        still alive after `timeout` seconds. Under pytest-xdist only that
+        pid is signaled, otherwise any kytosd left over is also killed.
+        Return the shutdown time.
+        """
+        pid_file = pid_path(BASE_ENV)
+        start = time.monotonic()
+        managed = self.controller is not None and self.controller.is_running()
+        try:
+            if managed:
+                pid = self.controller.pid
+            else:
+                with open(pid_file, "r") as f:
+                    pid = int(f.read())
+            os.kill(pid, signal.SIGTERM)
+        except (FileNotFoundError, ValueError, ProcessLookupError):
+            # no pid file (or a stale one): make sure no kytosd is left over,
+            # unless other pytest-xdist workers run theirs, which only the
+            # pid file tells apart
+            pid = None
+            if not ISOLATED:
+                os.system('pkill kytosd')
+
+        def is_running():
+            if managed:
+                return self.controller.is_running()
+            if pid is None:
+                return not ISOLATED and os.system('pgrep kytosd >/dev/null') == 0
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return False
+            return True
+
+        deadline = start + timeout
+        while is_running() and time.monotonic() < deadline:
+            time.sleep(interval)
+
+        if is_running():
+            print("FAIL to stop kytos after %s seconds. Force stop!" % timeout)
+            if pid is not None:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            if not ISOLATED:
+                os.system('pkill -9 kytosd')
+        if os.path.exists(pid_file):
+            os.system(f'rm -f {pid_file}')
+        if self.clock is not None:
+            self.clock.close()
+            self.clock = None
+
+        elapsed = time.monotonic() - start
+        self.controller_stop_times.append(elapsed)
+        print("kytosd stopped in %.3f seconds" % elapsed)
+        return elapsed
+
     def start_controller(self, clean_config=False, enable_all=False,
                          del_flows=False, port=None, database='mongodb',
-                         extra_args=os.environ.get("KYTOSD_EXTRA_ARGS", "")):
+                         extra_args=os.environ.get("KYTOSD_EXTRA_ARGS", ""),
+                         managed=bool(os.environ.get("KYTOSD_MANAGED")),
+                         napps=(), restore_db=False, restore_flows=False,
+                         clock_speed=float(os.environ.get("KYTOSD_CLOCK_SPEED", 0))):
+        """Restart kytosd.
+
+        With `restore_db`, the database is restored to the last snapshot
+        instead of being dropped by `clean_config`. With `restore_flows`, the
+        flow tables are restored to the last checkpoint while kytosd is down,
+        so its consistency check can't race the restore.
+        Startup waits for `napps` to be ready, see wait_controller_start().
+        When `managed` is set, kytosd runs as a KytosController subprocess
+        and startup is first detected from its log stream; the load time of
+        each NApp is kept at `self.controller.napp_load_times()`.
+        With `clock_speed`, kytosd runs under a FakeClock going that many
+        times faster than the real one, see controller_timeout().
+        """
         # Restart kytos and check if the napp is still disabled
-        try:
-            os.system('pkill kytosd')
-            # with open('/var/run/kytos/kytosd.pid', "r") as f:
-            #    pid = int(f.read())
-            #    os.kill(pid, signal.SIGTERM)
-            time.sleep(5)
-            pid_path = os.path.join(BASE_ENV, 'var/run/kytos/kytosd.pid')
-            if os.path.exists(pid_path):
-                raise Exception("Kytos pid still exists.")
-        except Exception as e:
-            print("FAIL to stop kytos after 5 seconds -- %s. Force stop!" % e)
-            os.system('pkill -9 kytosd')
-            os.system(f'rm -f {pid_path}')
-
-        if clean_config and database:
+        self.mutated = True
+        self.stop_controller()
+
+        if restore_db and database and self.db_snapshot is not None:
+            try:
+                self.restore_database()
+            except ServerSelectionTimeoutError as exc:
+                print(f"FAIL to restore database. {str(exc)}")
+        elif clean_config and database:
             try:
                 self.drop_database()
             except ServerSelectionTimeoutError as exc:
                 print(f"FAIL to drop database. {str(exc)}")
 
         if clean_config or del_flows:
-            # Remove any installed flow
-            for sw in self.net.switches:
-                sw.dpctl('del-flows')
+            # Remove any installed flow (or only the ones selected by the
+            # del_flows() filters given as a dict)
+            self.del_flows(**(del_flows if isinstance(del_flows, dict) else {}))
+
+        if restore_flows and self.flows_checkpoint is not None:
+            self.restore_flows()
 
-        daemon = 'kytosd'
+        args = kytosd_args(BASE_ENV)
         if database:
-            daemon += f' --database {database}'
+            args += ['--database', database]
         if port:
-            daemon += ' --port %s' % port
+            args += ['--port', str(port)]
         if enable_all:
-            daemon += ' -E'
+            args.append('-E')
         if extra_args:
-            daemon += ' ' + extra_args
-        os.system(daemon)
+            args += shlex.split(extra_args)
 
-        self.wait_controller_start()
+        env = kytosd_env()
+        if clock_speed:
+            self.clock = FakeClock(clock_speed)
+            env.update(self.clock.env())
+            self.clock.start()
 
-    def wait_controller_start(self):
-        """Wait until controller starts according to core/status API."""
-        wait_count = 0
-        while wait_count < 60:
-            try:
-                response = requests.get('http://127.0.0.1:8181/api/kytos/core/status/', timeout=1)
-                assert response.json()['response'] == 'running'
-                break
-            except:
-                time.sleep(0.5)
-                wait_count += 0.5
+        launched_at = time.monotonic()
+        if managed:
+            self.controller = KytosController(napps)
+            self.controller.start(args, env=env)
+            self.controller.wait_ready()
         else:
-            msg = 'Timeout while starting Kytos controller.'
+            self.controller = None
+            subprocess.call(['kytosd'] + args, env=env)
+
+        self.wait_controller_start(napps, started_at=launched_at)
+
+    def wait_controller_start(self, napps=(), timeout=60, started_at=None):
+        """Wait until controller starts according to core/status API and the
+        given NApps ("username/napp_name") are enabled and serving requests.
+
+        The APIs are polled with exponential backoff starting at 20 ms.
+        Return a report with the time, in seconds since `started_at`, to the
+        first HTTP response, to the 'running' status and to each NApp.
+        """
+        started_at = time.monotonic() if started_at is None else started_at
+        report = {'http': None, 'running': None, 'napps': {}}
+        pending = set(napps)
+
+        def elapsed():
+            return time.monotonic() - started_at
+
+        def ready():
+            try:
+                response = requests.get(f'{KYTOS_API}/core/status/', timeout=1)
+                if report['http'] is None:
+                    report['http'] = elapsed()
+                if response.json()['response'] != 'running':
+                    return False
+                if report['running'] is None:
+                    report['running'] = elapsed()
+                if not pending:
+                    return True
+                response = requests.get(f'{KYTOS_API}/core/napps_enabled/', timeout=1)
+                enabled = set('/'.join(napp) for napp in response.json()['napps'])
+            except (requests.exceptions.RequestException, ValueError, KeyError):
+                return False
+            for napp in sorted(pending & enabled):
+                endpoint = NAPP_READY_ENDPOINTS.get(napp)
+                if endpoint:
+                    try:
+                        response = requests.get(KYTOS_API + endpoint, timeout=1)
+                    except requests.exceptions.RequestException:
+                        continue
+                    if response.status_code != 200:
+                        continue
+                report['napps'][napp] = elapsed()
+                pending.discard(napp)
+            return not pending
+
+        try:
+            wait_until(ready, timeout=timeout, interval=0.02, max_interval=0.5)
+        except Exception:
+            msg = 'Timeout while starting Kytos controller. Pending NApps: %s' % sorted(pending)
             raise Exception(msg)
+        self.controller_start_report = report
+        return report
+
+    def wait_switches_connect(self, timeout=30):
+        """Wait until all switches are connected to the controller.
 
-    def wait_switches_connect(self):
-        max_wait = 0
-        while any(not sw.connected() for sw in self.net.switches):
-            time.sleep(1)
-            max_wait += 1
-            if max_wait > 30:
-                status = [(sw.name, sw.connected()) for sw in self.net.switches]
-                raise Exception('Timeout: timed out waiting switches reconnect. Status %s' % status)
+        A single `ovsdb-client monitor` stream on the Controller table
+        is_connected column is followed, so this returns as soon as the last
+        switch connects. The connect latency of each switch, in seconds
+        since the call, is kept at self.switch_connect_latency.
+        """
+        start = time.monotonic()
+        state = self.switches_connection_state()
+        controllers = {uuid: sw.name for sw in self.net.switches for uuid in sw._uuids}
+        pending = {name for name, connected in state.items() if not connected}
+        self.switch_connect_latency = {name: 0.0 for name in state if name not in pending}
+        if not pending:
+            return self.switch_connect_latency
+
+        proc = subprocess.Popen(
+            ['ovsdb-client', '--format=csv', '--data=bare', '--no-headings',
+             'monitor', 'Open_vSwitch', 'Controller', 'is_connected'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        try:
+            buffer = b''
+            deadline = start + timeout
+            while pending:
+                remaining = deadline - time.monotonic()
+                ready = remaining > 0 and select.select([proc.stdout], [], [], remaining)[0]
+                data = os.read(proc.stdout.fileno(), 4096) if ready else b''
+                if not data:
+                    status = [(sw.name, sw.name not in pending) for sw in self.net.switches]
+                    raise Exception('Timeout: timed out waiting switches reconnect. Status %s' % status)
+                buffer += data
+                *lines, buffer = buffer.split(b'\n')
+                now = time.monotonic()
+                for line in lines:
+                    # row uuid, action (initial, insert, old, new), is_connected
+                    fields = line.decode().strip().split(',')
+                    if len(fields) != 3 or fields[1] == 'old' or fields[2] != 'true':
+                        continue
+                    for uuid, name in controllers.items():
+                        if uuid.startswith(fields[0]) and name in pending:
+                            pending.discard(name)
+                            self.switch_connect_latency[name] = now - start
+        finally:
+            proc.terminate()
+            proc.wait()
+        return self.switch_connect_latency
+
+    def controller_now(self):
+        """Return the current UTC time as seen by kytosd."""
+        if self.clock is None:
+            return datetime.utcnow()
+        return self.clock.now()
+
+    def log_mark(self):
+        """Return the position of the managed kytosd log, see log_since()."""
+        if self.controller is None:
+            return None
+        return self.controller, self.controller.log_mark()
+
+    def log_since(self, mark=None):
+        """Return the managed kytosd log lines read since the log_mark()
+        `mark`, and the whole log of a kytosd started after it."""
+        if self.controller is None:
+            return []
+        controller, index = mark or (None, 0)
+        return self.controller.log_since(index if controller is self.controller else 0)
+
+    def controller_timeout(self, seconds):
+        """Return the real time in which `seconds` pass on the kytosd
+        clock, e.g. to wait for a scheduled job."""
+        if self.clock is None:
+            return seconds
+        return seconds / self.clock.speed
+
+    def controller_sleep(self, seconds):
+        """Sleep until `seconds` have passed on the kytosd clock."""
+        time.sleep(self.controller_timeout(seconds))
 
     def restart_kytos_clean(self):
         self.start_controller(clean_config=True, enable_all=True)
         self.wait_switches_connect()
 
-    def reconnect_switches(self, target="tcp:127.0.0.1:6653",
-                           temp_target="tcp:127.0.0.1:6654"):
+    def restart_kytos_baseline(self):
+        """Restart kytos from a database with the topology already
+        discovered and with the baseline flows (LLDP and coloring) on the
+        switches.
+
+        The first call does a clean restart, waits for the topology
+        discovery and checkpoints the database and the flow tables; next
+        calls restore them.
+        """
+        if self.db_snapshot is None or self.flows_checkpoint is None:
+            self.restart_kytos_clean()
+            wait_topology_ready(self)
+            self.snapshot_database()
+            self.checkpoint_flows()
+            return
+        self.start_controller(enable_all=True, restore_db=True, restore_flows=True)
+        self.wait_switches_connect()
+
+    @staticmethod
+    def _strip_volatile(value):
+        if isinstance(value, dict):
+            return {
+                key: NetworkTest._strip_volatile(item)
+                for key, item in value.items() if key not in VOLATILE_KEYS
+            }
+        if isinstance(value, list):
+            return [NetworkTest._strip_volatile(item) for item in value]
+        return value
+
+    def state_fingerprint(self):
+        """Return a hash of the topology, EVCs and flows known by kytos and
+        of the flows installed on the switches, without counters."""
+        digest = hashlib.sha256()
+        for endpoint in STATE_ENDPOINTS:
+            response = requests.get(KYTOS_API + endpoint)
+            digest.update(endpoint.encode())
+            digest.update(str(response.status_code).encode())
+            if response.status_code == 200:
+                state = self._strip_volatile(response.json())
+                digest.update(json.dumps(state, sort_keys=True).encode())
+        for sw in sorted(self.net.switches, key=lambda sw: sw.name):
+            flows = sw.dpctl('dump-flows', '--no-stats').strip().splitlines()
+            digest.update(sw.name.encode())
+            digest.update('\n'.join(sorted(flow.strip() for flow in flows)).encode())
+        return digest.hexdigest()
+
+    def restart_kytos_if_mutated(self, clean_config=True, enable_all=True,
+                                 settle=None):
+        """Restart kytos as start_controller(clean_config, enable_all) does,
+        unless the tests since the last call were all marked `readonly` and
+        the state fingerprint confirms they left kytos untouched.
+
+        `settle` is called after a restart to bring kytos to the state the
+        tests start from; it defaults to waiting for the topology when all
+        elements are enabled. Return True if kytos was restarted.
+        """
+        config = (clean_config, enable_all)
+        if (not self.mutated and self.pristine is not None
+                and self.pristine[0] == config
+                and self.pristine[1] == self.state_fingerprint()):
+            print("kytos state unchanged, restart skipped")
+            return False
+        self.start_controller(clean_config=clean_config, enable_all=enable_all)
+        self.wait_switches_connect()
+        if settle is not None:
+            settle()
+        elif enable_all:
+            wait_topology_ready(self)
+        self.pristine = (config, self.state_fingerprint())
+        self.mutated = False
+        return True
+
+    def switches_connection_state(self):
+        """Return {switch name: is_connected} from a single OVSDB query.
+
+        The controller UUIDs cached by each mininet switch are refreshed as
+        well, so sw.connected() keeps working after set-controller.
+        """
+        output = quietRun(
+            'ovs-vsctl --format=csv --data=bare --no-headings'
+            ' -- --columns=name,controller list Bridge'
+            ' -- --columns=_uuid,is_connected list Controller'
+        )
+        bridges, connected = {}, {}
+        for line in output.splitlines():
+            fields = line.strip().split(',')
+            if len(fields) != 2:
+                continue
+            if fields[1] in ('true', 'false'):
+                connected[fields[0]] = fields[1] == 'true'
+            else:
+                bridges[fields[0]] = fields[1].split()
+        state = {}
+        for sw in self.net.switches:
+            uuids = bridges.get(sw.name, [])
+            sw._uuids = uuids
+            state[sw.name] = any(connected.get(uuid) for uuid in uuids)
+        return state
+
+    def reconnect_switches(self, target=f"tcp:127.0.0.1:{OF_PORT}",
+                           temp_target=f"tcp:127.0.0.1:{OF_PORT + 1}", batched=True,
+                           timeout=30):
         """Restart switches connections.
         This method can also be used to trigger a consistency check initial run.
 
         A temporary target is used in order to avoid OvS deleting the flows
         if the controller config were to be deleted.
+
+        With `batched`, each phase is a single ovs-vsctl transaction for all
+        bridges and the reconnection is confirmed from the OVSDB Controller
+        table.
         """
-        for sw in self.net.switches:
-            sw.vsctl(f"set-controller {sw.name} {temp_target}")
-            sw.controllerUUIDs(update=True)
-        for sw in self.net.switches:
-            sw.vsctl(f"set-controller {sw.name} {target}")
-            sw.controllerUUIDs(update=True)
-        self.wait_switches_connect()
+        if not batched:
+            for sw in self.net.switches:
+                sw.vsctl(f"set-controller {sw.name} {temp_target}")
+                sw.controllerUUIDs(update=True)
+            for sw in self.net.switches:
+                sw.vsctl(f"set-controller {sw.name} {target}")
+                sw.controllerUUIDs(update=True)
+            self.wait_switches_connect()
+            return
+
+        for controller in (temp_target, target):
+            quietRun('ovs-vsctl ' + ' '.join(
+                f'-- set-controller {sw.name} {controller}'
+                for sw in self.net.switches
+            ))
+        self.wait_switches_connect(timeout)
 
-    def config_all_links_up(self):
+    @staticmethod
+    def _admin_up_interfaces(node):
+        """Return the names of the interfaces administratively up in the
+        namespace of node."""
+        up = set()
+        for line in node.cmd('ip -o link show').splitlines():
+            fields = line.split(': ')
+            if len(fields) < 3:
+                continue
+            flags = fields[2].split('>')[0].lstrip('<').split(',')
+            if 'UP' in flags:
+                up.add(fields[1].split('@')[0])
+        return up
+
+    def config_all_links_up(self, max_workers=16):
+        """Set up the interfaces of every link that is down.
+
+        The state is read with one `ip link` per namespace and the down
+        interfaces are brought up with one `ip -batch` per namespace, all
+        namespaces in parallel. Return the links that were changed.
+        """
+        # the switches share the root namespace, each host has its own
+        runners, names = {}, {}
         for link in self.net.links:
-            self.net.configLinkStatus(
-                link.intf1.node.name,
-                link.intf2.node.name,
-                "up"
-            )
+            for intf in (link.intf1, link.intf2):
+                key = intf.node if intf.node.inNamespace else None
+                runners.setdefault(key, intf.node)
+                names.setdefault(key, set()).add(intf.name)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            up = dict(zip(runners, executor.map(
+                self._admin_up_interfaces, runners.values())))
+
+            down = {key: names[key] - up[key] for key in runners}
+            changed = [
+                link for link in self.net.links
+                if any(intf.name in down[intf.node if intf.node.inNamespace else None]
+                       for intf in (link.intf1, link.intf2))
+            ]
+
+            def set_up(key):
+                commands = ''.join(f'link set dev {name} up\\n'
+                                   for name in sorted(down[key]))
+                runners[key].cmd(f"printf '{commands}' | ip -batch -")
+
+            list(executor.map(set_up, [key for key in runners if down[key]]))
+        return changed
+
+    def reset(self):
+        """Bring the network back to its initial state without rebuilding it:
+        all links up, no VLAN interfaces left on hosts, only the configured
+        IP addresses on the host interfaces and no flows.
+
+        The database snapshot, the flows checkpoint and the pristine state
+        of the previous user are dropped as well.
+        """
+        self.mutated = True
+        self.pristine = None
+        self.db_snapshot = None
+        self.flows_checkpoint = None
+        self.config_all_links_up()
+        for host in self.net.hosts:
+            host.cmd("ip -o link show type vlan | awk -F'[:@ ]+' '{print $2}'"
+                     " | xargs -r -n1 ip link del")
+            host.cmd('; '.join(f'ip addr flush dev {name} scope global'
+                               for name in host.intfNames() if name != 'lo'))
+            ip = host.params.get('ip')
+            if ip and host.defaultIntf() is not None:
+                host.setIP(ip)
+        self.del_flows()
+
+    def del_flows(self, switches=None, tables=None, cookies=None, max_workers=16):
+        """Delete the flows of the switches concurrently.
+
+        By default all flows of all switches are removed. `tables` restricts
+        the removal to the given table ids and `cookies` to the given
+        (cookie, mask) pairs, so baseline flows such as LLDP and coloring
+        can be kept.
+        """
+        switches = self.net.switches if switches is None else switches
+        matches = []
+        for table in tables or [None]:
+            for cookie in cookies or [None]:
+                match = []
+                if table is not None:
+                    match.append(f'table={table}')
+                if cookie is not None:
+                    match.append('cookie=%#x/%#x' % tuple(cookie))
+                matches.append(','.join(match))
+
+        def wipe(sw):
+            for match in matches:
+                sw.dpctl('del-flows', *([match] if match else []))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(wipe, switches))
 
     def stop(self):
+        if self.clock is not None:
+            # kytosd must not outlive the file of its fake clock
+            self.stop_controller()
         self.net.stop()
-        mininet.clean.cleanup()
+        self.started = False
+        if ISOLATED:
+            cleanup_worker()
+        else:
+            mininet.clean.cleanup()
+
+
+class NetworkPool:
+    """Keep a Mininet network alive across test modules.
+
+    The topologies share switch and interface names, so the pool holds a
+    single network at a time. It is reset between users instead of being
+    destroyed, and only reused for the same topology, controller and
+    NetworkTest arguments; acquiring anything else rebuilds it, which is
+    refused while the current network has not been released by all its
+    users.
+    """
+
+    def __init__(self):
+        self.network = None
+        self.topo_name = None
+        self.users = 0
+        self.build_times = {}
+        self.teardown_times = {}
+        self.reuses = {}
+        self.reset_time = 0
+
+    def acquire(self, controller_ip, topo_name="ring", **kwargs):
+        """Return a started NetworkTest for topo_name."""
+        net = self.network
+        if (net is not None and self.topo_name == topo_name
+                and net.pool_args == (controller_ip, kwargs)):
+            start = time.monotonic()
+            net.reset()
+            self.reset_time += time.monotonic() - start
+            self.reuses[topo_name] = self.reuses.get(topo_name, 0) + 1
+            self.users += 1
+            return net
+        if self.users:
+            raise Exception(f'Unable to build the {topo_name} network, the '
+                            f'{self.topo_name} one was not released')
+        self.stop_all()
+        start = time.monotonic()
+        net = NetworkTest(controller_ip, topo_name=topo_name, **kwargs)
+        net.pool_args = (controller_ip, kwargs)
+        net.net.start()
+        net.started = True
+        self.build_times[topo_name] = time.monotonic() - start
+        self.network, self.topo_name, self.users = net, topo_name, 1
+        return net
+
+    def release(self, net):
+        """Give the network back to the pool. It is kept alive for the next
+        acquire() once every user released it."""
+        if net is not self.network or not self.users:
+            raise Exception('Released a network the pool did not hand out')
+        self.users -= 1
+
+    def forget_users(self, users):
+        """Drop the users beyond `users` which never released the network,
+        e.g. a setup_class which failed, so its teardown_class never ran."""
+        self.users = min(self.users, users)
+
+    def stop_all(self):
+        if self.network is not None:
+            start = time.monotonic()
+            self.network.stop()
+            self.teardown_times[self.topo_name] = time.monotonic() - start
+        self.network, self.topo_name, self.users = None, None, 0
+
+    @property
+    def time_saved(self):
+        """Setup and teardown time avoided by reusing networks."""
+        saved = sum(
+            count * (self.build_times[topo_name] + self.teardown_times.get(topo_name, 0))
+            for topo_name, count in self.reuses.items()
+        )
+        return saved - self.reset_time
+
+
+NETWORK_POOL = NetworkPool()
@@ -0,0 +1,109 @@
+"""Duration history and duration-based scheduling of the test modules.
+
+The duration of every phase (setup, call, teardown) of every test is kept
+across runs in a JSON history file. The next runs use it to order the
+modules longest-first and, optionally, to split them into shards with
+balanced total duration (longest processing time first).
+"""
+import json
+import os
+from collections import OrderedDict
+
+# weight of the last run on the stored durations
+SMOOTHING = 0.5
+
+
+def load_history(path):
+    """Return {nodeid: {phase: seconds}} stored at path."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_history(path, history):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, "w") as f:
+        json.dump(history, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def module_of(nodeid):
+    return nodeid.split('::')[0]
+
+
+def balance_shards(durations, num_shards):
+    """Split {module: seconds} in num_shards lists of modules, assigning the
+    longest module to the least loaded shard first."""
+    shards = [[] for _ in range(num_shards)]
+    loads = [0.0] * num_shards
+    for module in sorted(durations, key=lambda m: (-durations[m], m)):
+        shard = loads.index(min(loads))
+        shards[shard].append(module)
+        loads[shard] += durations[module]
+    return shards, loads
+
+
+class DurationScheduler:
+    """pytest plugin recording the phase durations and scheduling modules."""
+
+    def __init__(self, path, shard_id=None, num_shards=None):
+        self.path = path
+        self.shard_id = shard_id
+        self.num_shards = num_shards
+        self.history = load_history(path)
+        self.durations = {}
+
+    def test_duration(self, nodeid):
+        phases = self.history.get(nodeid)
+        if phases is None:
+            return None
+        return sum(phases.values())
+
+    def module_durations(self, items):
+        known = [d for d in map(self.test_duration, self.history) if d is not None]
+        # tests not seen before are assumed to take the average time
+        default = sum(known) / len(known) if known else 0.0
+        durations = OrderedDict()
+        for item in items:
+            duration = self.test_duration(item.nodeid)
+            module = module_of(item.nodeid)
+            durations[module] = durations.get(module, 0.0) + (
+                default if duration is None else duration
+            )
+        return durations
+
+    def pytest_collection_modifyitems(self, session, config, items):
+        durations = self.module_durations(items)
+        modules = sorted(durations, key=lambda m: -durations[m])
+        if self.num_shards:
+            shards, _ = balance_shards(durations, self.num_shards)
+            selected = set(shards[self.shard_id])
+            deselected = [i for i in items if module_of(i.nodeid) not in selected]
+            if deselected:
+                config.hook.pytest_deselected(items=deselected)
+            modules = [m for m in modules if m in selected]
+        # the order of the tests inside each module is kept
+        position = {module: index for index, module in enumerate(modules)}
+        items[:] = sorted(
+            (i for i in items if module_of(i.nodeid) in position),
+            key=lambda i: position[module_of(i.nodeid)],
+        )
+
+    def pytest_runtest_logreport(self, report):
+        self.durations.setdefault(report.nodeid, {})[report.when] = report.duration
+
+    def pytest_sessionfinish(self, session):
+        if getattr(session.config, 'workerinput', None) is not None:
+            # xdist workers send their reports to the controller process
+            return
+        history = load_history(self.path)
+        for nodeid, phases in self.durations.items():
+            stored = history.setdefault(nodeid, {})
+            for phase, duration in phases.items():
+                previous = stored.get(phase)
+                stored[phase] = duration if previous is None else (
+                    SMOOTHING * duration + (1 - SMOOTHING) * previous
+                )
+        save_history(self.path, history)
@@ -0,0 +1,181 @@
+"""Account where the wall-clock time of the tests is spent waiting.
+
+While each test runs (setup, call and teardown), time.sleep, the requests
+calls and the mininet cmd/dpctl subprocesses are wrapped, and the time they
+block is attributed to their call site (file:line) in the test code, past
+the helpers and waiters frames. Calls made concurrently by thread pools are
+accounted once, as `pool` time, where the test waits for their results with
+Future.result (as executor.map does), labelled with the submitted callable;
+the time blocked in concurrent.futures.as_completed or wait is not
+accounted. Under pytest-xdist the workers send their accounting to the
+controller, whose terminal summary and JSON artifact rank the call sites by
+total time.
+"""
+import concurrent.futures
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+import requests
+from mininet.node import Node, OVSSwitch
+
+
+class SleepProfiler:
+    """pytest plugin ranking the call sites which block the tests."""
+
+    def __init__(self, path, top=20):
+        self.path = path
+        self.top = top
+        # (kind, call site) -> [count, seconds]
+        self.sites = defaultdict(lambda: [0, 0.0])
+        # nodeid -> kind -> seconds
+        self.per_test = defaultdict(lambda: defaultdict(float))
+        self.nodeid = None
+        # thread running the test, the only one whose calls are accounted
+        self._thread = None
+        self._local = threading.local()
+        tests_dir = os.path.dirname(__file__)
+        self._ignored = tuple(
+            os.path.dirname(module.__file__) + os.sep
+            for module in (requests, sys.modules[Node.__module__], concurrent.futures)
+        ) + (__file__,) + tuple(
+            os.path.join(tests_dir, name) for name in ('helpers.py', 'waiters.py')
+        )
+
+    def call_site(self):
+        frame = sys._getframe(2)
+        while frame is not None and frame.f_code.co_filename.startswith(self._ignored):
+            frame = frame.f_back
+        if frame is None:
+            return '<unknown>'
+        filename = os.path.relpath(frame.f_code.co_filename)
+        return f'{filename}:{frame.f_lineno}'
+
+    def wrap(self, kind, func, label=None):
+        """Return func timed and accounted as `kind`.
+
+        Nested wrapped calls (e.g., dpctl calling cmd) are accounted only
+        once, by the outermost call, and calls from other threads are left
+        to the `pool` wait of the test thread. label(*args) is appended to
+        the call site, if given.
+        """
+        profiler = self
+
+        def wrapper(*args, **kwargs):
+            if (threading.current_thread() is not profiler._thread
+                    or getattr(profiler._local, 'active', False)):
+                return func(*args, **kwargs)
+            site = profiler.call_site()
+            if label is not None:
+                site = f'{site} ({label(*args)})'
+            profiler._local.active = True
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                profiler._local.active = False
+                profiler.account(kind, site, elapsed)
+
+        return wrapper
+
+    @staticmethod
+    def tag_submit(submit):
+        """Return submit tagging the futures with the name of their callable,
+        so the `pool` time is accounted per submitted callable."""
+
+        def wrapper(executor, fn, /, *args, **kwargs):
+            future = submit(executor, fn, *args, **kwargs)
+            future.profiled_callable = getattr(fn, '__qualname__', repr(fn))
+            return future
+
+        return wrapper
+
+    def account(self, kind, site, elapsed):
+        entry = self.sites[(kind, site)]
+        entry[0] += 1
+        entry[1] += elapsed
+        if self.nodeid:
+            self.per_test[self.nodeid][kind] += elapsed
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        patches = [
+            (time, 'sleep', self.wrap('sleep', time.sleep)),
+            (requests.Session, 'request', self.wrap('requests', requests.Session.request)),
+            (Node, 'cmd', self.wrap('mininet', Node.cmd)),
+            (OVSSwitch, 'dpctl', self.wrap('mininet', OVSSwitch.dpctl)),
+            (ThreadPoolExecutor, 'submit', self.tag_submit(ThreadPoolExecutor.submit)),
+            (Future, 'result', self.wrap(
+                'pool', Future.result,
+                lambda future, *args: getattr(future, 'profiled_callable', '?'),
+            )),
+        ]
+        originals = [(obj, name, getattr(obj, name)) for obj, name, _ in patches]
+        for obj, name, wrapper in patches:
+            setattr(obj, name, wrapper)
+        self.nodeid = item.nodeid
+        self._thread = threading.current_thread()
+        try:
+            yield
+        finally:
+            self.nodeid = None
+            self._thread = None
+            for obj, name, original in originals:
+                setattr(obj, name, original)
+
+    def ranking(self):
+        return sorted(
+            (
+                {'kind': kind, 'site': site, 'count': count, 'seconds': seconds}
+                for (kind, site), (count, seconds) in self.sites.items()
+            ),
+            key=lambda entry: -entry['seconds'],
+        )
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        output = getattr(node, 'workeroutput', {}).get('sleep_profile')
+        if not output:
+            return
+        for kind, site, count, seconds in output['sites']:
+            entry = self.sites[(kind, site)]
+            entry[0] += count
+            entry[1] += seconds
+        for nodeid, kinds in output['tests'].items():
+            for kind, seconds in kinds.items():
+                self.per_test[nodeid][kind] += seconds
+
+    def pytest_sessionfinish(self, session):
+        if hasattr(session.config, 'workerinput'):
+            # xdist workers send their accounting to the controller process
+            session.config.workeroutput['sleep_profile'] = {
+                'sites': [[kind, site, count, seconds]
+                          for (kind, site), (count, seconds) in self.sites.items()],
+                'tests': {nodeid: dict(kinds) for nodeid, kinds in self.per_test.items()},
+            }
+            return
+        with open(self.path, "w") as f:
+            json.dump({'sites': self.ranking(), 'tests': self.per_test}, f, indent=1)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        ranking = self.ranking()
+        if not ranking:
+            return
+        terminalreporter.section('blocking call sites', sep='-', bold=True)
+        totals = defaultdict(float)
+        for entry in ranking:
+            totals[entry['kind']] += entry['seconds']
+        terminalreporter.write_line(
+            ', '.join(f'{kind}: {seconds:.1f}s' for kind, seconds in sorted(totals.items()))
+        )
+        for entry in ranking[:self.top]:
+            terminalreporter.write_line(
+                '{seconds:10.1f}s {count:6d}x {kind:8} {site}'.format(**entry)
+            )
+        terminalreporter.write_line(f'full report: {self.path}')
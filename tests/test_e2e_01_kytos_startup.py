@@ -1,13 +1,12 @@
 import time
 import shutil
 import requests
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
 import re
 import os
 import pytest
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
 
 # TODO: check all the logs on the end
 # TODO: persist the logs of syslog
@@ -31,7 +30,7 @@ class TestE2EKytosServer:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = cls.network_pool.acquire(CONTROLLER)
         cls.net.start()
         cls.net.wait_switches_connect()
         # rotate logfile (copy/truncate strategy)
@@ -46,7 +45,7 @@ class TestE2EKytosServer:
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def test_start_kytos_api_core(self):
 
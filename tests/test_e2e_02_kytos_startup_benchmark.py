@@ -0,0 +1,152 @@
+import os
+
+import pytest
+import requests
+
+from tests.benchmarks import summarize, write_results
+from tests.waiters import wait_topology_ready, wait_until
+from tests.workers import KYTOS_API
+
+CONTROLLER = '127.0.0.1'
+
+NAPPS = [
+    'kytos/pathfinder',
+    'kytos/mef_eline',
+    'kytos/maintenance',
+    'kytos/flow_manager',
+    'kytos/of_core',
+    'kytos/topology',
+    'kytos/of_lldp',
+    'kytos/of_multi_table',
+    'amlight/sdntrace',
+    'amlight/coloring',
+    'amlight/sdntrace_cp',
+    'amlight/kytos_stats',
+]
+
+# cold starts measured for each database state
+RUNS = int(os.environ.get('BENCHMARK_STARTUP_RUNS', 10))
+# content of the pre-populated database
+POPULATED_EVCS = int(os.environ.get('BENCHMARK_STARTUP_EVCS', 100))
+POPULATED_FLOWS = int(os.environ.get('BENCHMARK_STARTUP_FLOWS', 1000))
+
+
+@pytest.mark.benchmark
+class TestE2EKytosStartupBenchmark:
+    """Cold start kytosd repeatedly and report how long it takes to run
+    and how long each NApp takes to load and to serve its API."""
+
+    net = None
+    results = {}
+
+    @classmethod
+    def setup_class(cls):
+        cls.net = cls.network_pool.acquire(CONTROLLER)
+        cls.net.start()
+        cls.net.restart_kytos_clean()
+        wait_topology_ready(cls.net)
+        # the baseline snapshot is replaced by the populated database
+        cls.baseline_snapshot = cls.net.db_snapshot
+
+    @classmethod
+    def teardown_class(cls):
+        cls.net.db_snapshot = cls.baseline_snapshot
+        cls.network_pool.release(cls.net)
+
+    def cold_start(self, **kwargs):
+        """Start kytosd and return its startup times, in seconds."""
+        self.net.start_controller(enable_all=True, managed=True, napps=NAPPS,
+                                  **kwargs)
+        report = self.net.controller_start_report
+        return {
+            'running': report['running'],
+            'napps_loaded': self.net.controller.napp_load_times(),
+            'napps_ready': report['napps'],
+        }
+
+    def benchmark(self, name, **kwargs):
+        runs = [self.cold_start(**kwargs) for _ in range(RUNS)]
+        napps = sorted(set().union(*(run['napps_loaded'] for run in runs),
+                                   *(run['napps_ready'] for run in runs)))
+        summary = {
+            'running': summarize(run['running'] for run in runs),
+            'napps': {
+                napp: {
+                    kind: summarize(run[f'napps_{kind}'][napp] for run in runs
+                                    if napp in run[f'napps_{kind}'])
+                    for kind in ('loaded', 'ready')
+                }
+                for napp in napps
+            },
+        }
+        self.results[name] = {'runs': runs, 'summary': summary}
+        print(f"{name}: running p50 {summary['running']['p50']:.2f}s "
+              f"p90 {summary['running']['p90']:.2f}s")
+        for napp, kinds in summary['napps'].items():
+            print('  %-22s loaded p50 %s, ready p50 %s' % (
+                napp,
+                '%.2fs' % kinds['loaded']['p50'] if kinds['loaded']['count'] else '-',
+                '%.2fs' % kinds['ready']['p50'] if kinds['ready']['count'] else '-',
+            ))
+        return summary
+
+    def populate(self):
+        """Store POPULATED_EVCS EVCs and POPULATED_FLOWS flows."""
+        api_url = KYTOS_API + '/mef_eline/v2/evc/'
+        for i in range(POPULATED_EVCS):
+            payload = {
+                "name": "bench evc %s" % i,
+                "enabled": True,
+                "uni_a": {
+                    "interface_id": "00:00:00:00:00:00:00:01:1",
+                    "tag": {"tag_type": "vlan", "value": 100 + i}
+                },
+                "uni_z": {
+                    "interface_id": "00:00:00:00:00:00:00:01:2",
+                    "tag": {"tag_type": "vlan", "value": 100 + i}
+                }
+            }
+            response = requests.post(api_url, json=payload)
+            assert response.status_code == 201, response.text
+
+        dpid = '00:00:00:00:00:00:00:02'
+        flows = [
+            {
+                "cookie": 0xbb00000000000000 + i,
+                "priority": 100,
+                "match": {"in_port": 1, "dl_vlan": 1 + i % 4000},
+                "actions": [{"action_type": "output", "port": 2}]
+            }
+            for i in range(POPULATED_FLOWS)
+        ]
+        flows_url = KYTOS_API + '/flow_manager/v2/flows/' + dpid
+        for i in range(0, len(flows), 500):
+            response = requests.post(flows_url, json={"flows": flows[i:i + 500]})
+            assert response.status_code == 202, response.text
+
+        def stored():
+            evcs = requests.get(api_url).json()
+            stored_flows = requests.get(flows_url).json()[dpid]['flows']
+            return len(evcs) >= POPULATED_EVCS and len(stored_flows) >= POPULATED_FLOWS
+        wait_until(stored, timeout=300, msg='EVCs and flows to be stored')
+
+    def test_010_cold_start_empty_database(self):
+        summary = self.benchmark('empty', clean_config=True)
+        assert summary['running']['count'] == RUNS
+
+    def test_020_cold_start_populated_database(self):
+        self.net.start_controller(clean_config=True, enable_all=True)
+        self.net.wait_switches_connect()
+        wait_topology_ready(self.net)
+        self.populate()
+        self.net.snapshot_database()
+        summary = self.benchmark('populated', restore_db=True, del_flows=True)
+        assert summary['running']['count'] == RUNS
+
+    def test_999_save_results(self, benchmark_dir):
+        path = write_results(benchmark_dir, 'kytos_startup', {
+            'runs_per_case': RUNS,
+            'populated': {'evcs': POPULATED_EVCS, 'flows': POPULATED_FLOWS},
+            'cases': self.results,
+        })
+        print(f"results saved to {path}")
@@ -1,11 +1,12 @@
 import json
+import pytest
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import wait_topology_ready
 import time
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
 
 
 class TestE2ETopology:
@@ -17,20 +18,19 @@ class TestE2ETopology:
         """
         # Start the controller setting an environment in
         # which all elements are disabled in a clean setting
-        self.net.start_controller(clean_config=True, enable_all=False)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.restart_kytos_if_mutated(clean_config=True, enable_all=False,
+                                          settle=lambda: time.sleep(10))
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = cls.network_pool.acquire(CONTROLLER)
         cls.net.start()
         cls.net.wait_switches_connect()
         time.sleep(10)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def restart(self, _clean_config=False, _enable_all=False):
 
@@ -42,6 +42,7 @@ class TestE2ETopology:
         # Wait a few seconds to kytos execute LLDP
         time.sleep(10)
 
+    @pytest.mark.readonly
     def test_005_list_topology(self):
         """
         Test /api/kytos/topology/v3/ on GET
@@ -77,6 +78,7 @@ class TestE2ETopology:
             for link in data['topology']['switches'][str(switch)]['interfaces']:
                 assert 'link' in data['topology']['switches'][str(switch)]['interfaces'][link]
 
+    @pytest.mark.readonly
     def test_010_list_switches(self):
         """
         Test /api/kytos/topology/v3/switches on GET
@@ -787,7 +789,7 @@ class TestE2ETopology:
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(5)
+        wait_topology_ready(self.net)
 
         # Make sure the switch is disabled
         api_url = KYTOS_API + '/topology/v3/switches'
@@ -804,7 +806,7 @@ class TestE2ETopology:
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(5)
+        wait_topology_ready(self.net)
 
         # Make sure the interfaces are disabled
         api_url = KYTOS_API + '/topology/v3/interfaces'
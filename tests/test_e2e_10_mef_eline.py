@@ -7,10 +7,13 @@ import pytest
 from random import randrange
 import requests
 
-from tests.helpers import NetworkTest
+from tests.flows import evc_cookie
+from tests.workers import KYTOS_API
+from tests.waiters import (evc_active, wait_evc_deployed, wait_evc_path_avoids,
+                           wait_evc_removed, wait_links_active,
+                           wait_topology_ready, wait_until)
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
 
 TIME_FMT = "%Y-%m-%dT%H:%M:%S+0000"
 
@@ -32,24 +35,23 @@ class TestE2EMefEline:
         """
         # Since some tests may set a link to down state, we should reset
         # the link state to up (for all links)
-        self.net.config_all_links_up()
+        changed = self.net.config_all_links_up()
         # Start the controller setting an environment in
-        # which all elements are disabled in a clean setting
-        self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        # which all elements are enabled in a clean setting
+        if not self.net.restart_kytos_if_mutated(clean_config=True, enable_all=True):
+            wait_links_active(self.net, changed)
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = cls.network_pool.acquire(CONTROLLER)
         cls.net.start()
         cls.net.restart_kytos_clean()
         cls.net.wait_switches_connect()
-        time.sleep(5)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def restart(self, _clean_config=False, _enable_all=True):
         # Start the controller setting an environment in which the setting is
@@ -57,8 +59,8 @@ class TestE2EMefEline:
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
         self.net.wait_switches_connect()
 
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(10)
+        if _enable_all:
+            wait_topology_ready(self.net)
 
     def create_evc(self, vlan_id, store=False):
         payload = {
@@ -80,8 +82,10 @@ class TestE2EMefEline:
         data = response.json()
         if store:
             self.evcs[vlan_id] = data['circuit_id']
+        wait_evc_deployed(self.net, data['circuit_id'])
         return data['circuit_id']
 
+    @pytest.mark.readonly
     def test_010_list_evcs_should_be_empty(self):
         """Test if list circuits return 'no circuit stored.'."""
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
@@ -115,7 +119,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'], expected={'s1': 2})
 
         s1 = self.net.net.get('s1')
         flow_s1 = s1.dpctl('dump-flows')
@@ -172,7 +176,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'], expected=3)
 
         # search for the cookie, should have three flows:
         #  - 2 for the current path
@@ -229,7 +233,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(15)
+        wait_evc_deployed(self.net, data['circuit_id'], expected=3)
 
         # Each switch must have BASIC_FLOWS + 03 for the EVC:
         #  - 2 for current path (ingress + egress)
@@ -284,7 +288,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'], expected=3)
 
         # Each switch must have BASIC_FLOWS + 03 for the EVC:
         #  - 2 for current path (ingress + egress)
@@ -342,7 +346,7 @@ class TestE2EMefEline:
         data = response.json()
         assert 'circuit_id' in data
         evc1 = data['circuit_id']
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1, expected={'s1': 3, 's2': 3, 's3': 2})
 
         # Create circuit 2: same vlan id but in different UNIs
         payload = {
@@ -365,7 +369,7 @@ class TestE2EMefEline:
         assert 'circuit_id' in data
         evc2 = data['circuit_id']
         assert evc1 != evc2
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc2, expected={'s1': 3, 's2': 2, 's3': 3})
 
         # Switch s1 should have BASIC_FLOWS + 3 for evc1 + 3 for evc2
         # Switch s2 should have BASIC_FLOWS + 3 for evc1 + 2 for evc2/failover
@@ -442,7 +446,7 @@ class TestE2EMefEline:
         data = response.json()
         assert 'circuit_id' in data
         evc1 = data['circuit_id']
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1, expected=3)
 
         # It verifies EVC's status
         response = requests.get(api_url + evc1)
@@ -453,7 +457,7 @@ class TestE2EMefEline:
         payload = {"enable": False}
         response = requests.patch(api_url + evc1, data=json.dumps(payload), headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
-        time.sleep(10)
+        wait_evc_removed(self.net, evc1)
 
         # It verifies EVC's status
         response = requests.get(api_url + evc1)
@@ -502,13 +506,13 @@ class TestE2EMefEline:
         data = response.json()
         assert 'circuit_id' in data
         evc1 = data['circuit_id']
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1, expected=3)
 
         # Delete the circuit
         api_url += evc1
         response = requests.delete(api_url)
         assert response.status_code == 200, response.text
-        time.sleep(10)
+        wait_evc_removed(self.net, evc1)
 
         # try to reuse the vlan id
         payload = {
@@ -531,7 +535,7 @@ class TestE2EMefEline:
         assert 'circuit_id' in data
         evc2 = data['circuit_id']
         assert evc1 != evc2
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc2, expected=3)
 
         # Each switch must have BASIC_FLOWS + 03 for the EVC:
         #  - 2 for current path (ingress + egress)
@@ -592,7 +596,8 @@ class TestE2EMefEline:
         response = requests.post(api_url, data=json.dumps(payload), headers={'Content-type': 'application/json'})
         assert response.status_code == 201, response.text
 
-        time.sleep(10)
+        evc1 = response.json()['circuit_id']
+        wait_evc_deployed(self.net, evc1, expected={'s1': 2, 's2': 2, 's3': 2})
 
         # Each switch must have BASIC_FLOWS + 02 for the EVC:
         #  - 2 for current path (ingress + egress)
@@ -609,8 +614,10 @@ class TestE2EMefEline:
         # Command to up/down links to test if back-up path is taken
         self.net.net.configLinkStatus('s1', 's2', 'down')
 
-        # Wait just a few seconds to give time to the controller receive and process the linkDown event
-        time.sleep(10)
+        # wait for the controller to process the linkDown event and
+        # move the EVC to the backup path
+        wait_evc_path_avoids(self.net, evc1, 's1', 's2')
+        wait_evc_deployed(self.net, evc1, expected={'s1': 2, 's2': 0, 's3': 2})
 
         # # Check on the virtual switches directly for flows
         flows_s1 = s1.dpctl('dump-flows')
@@ -645,12 +652,12 @@ class TestE2EMefEline:
 
         # restart the controller and change the port on purpose to avoid switches to connect
         self.net.start_controller(clean_config=False, enable_all=True, port=9999)
-        time.sleep(10)
+        wait_until(lambda: requests.get(api_url + evc1).status_code == 200,
+                   msg='EVC %s to be loaded' % evc1)
 
         # Delete the circuit
         response = requests.delete(api_url + evc1)
         assert response.status_code == 200, response.text
-        time.sleep(10)
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -686,72 +693,92 @@ class TestE2EMefEline:
         """ Tests the creation and removal of ten circuits many times. """
         for x in range(1, 10):
             evcs = {}
-            for i in range(400, 410):
-                payload = {
-                    "name": "evc_%s" % i,
-                    "enabled": True,
-                    "dynamic_backup_path": True,
-                    "uni_a": {
-                        "interface_id": "00:00:00:00:00:00:00:01:1",
-                        "tag": {"tag_type": 1, "value": i}
-                    },
-                    "uni_z": {
-                        "interface_id": "00:00:00:00:00:00:00:02:1",
-                        "tag": {"tag_type": "vlan", "value": i}
+            with self.net.monitor_flows(['s1', 's2']) as monitor:
+                created_at = time.monotonic()
+                for i in range(400, 410):
+                    payload = {
+                        "name": "evc_%s" % i,
+                        "enabled": True,
+                        "dynamic_backup_path": True,
+                        "uni_a": {
+                            "interface_id": "00:00:00:00:00:00:00:01:1",
+                            "tag": {"tag_type": 1, "value": i}
+                        },
+                        "uni_z": {
+                            "interface_id": "00:00:00:00:00:00:00:02:1",
+                            "tag": {"tag_type": "vlan", "value": i}
+                        }
                     }
-                }
+                    api_url = KYTOS_API + '/mef_eline/v2/evc/'
+                    response = requests.post(api_url, data=json.dumps(payload), headers={'Content-type': 'application/json'})
+                    assert response.status_code == 201, response.text
+                    data = response.json()
+                    assert 'circuit_id' in data
+                    evcs[i] = data['circuit_id']
+
+                # wait for the three flows of each EVC on s1 and s2
+                cookies = [evc_cookie(evc_id) for evc_id in evcs.values()]
+                monitor.wait_until(
+                    lambda m: all(m.count(name, cookie) == 3
+                                  for name in ('s1', 's2') for cookie in cookies),
+                    timeout=60, msg=f'round={x} - flows of the EVCs on s1 and s2',
+                )
+                latency = monitor.install_latency(created_at)
+                print(f"round={x} - EVC flows installed in up to %.2fs" % max(
+                    (value for flows in latency.values() for value in flows.values()),
+                    default=0))
+                wait_until(lambda: all(evc_active(evc_id) for evc_id in evcs.values()),
+                           msg=f'round={x} - EVCs to be active')
+
+                # make sure the evcs are active and the flows were created
+                s1, s2 = self.net.net.get('s1', 's2')
+                snapshot = self.net.flow_snapshot([s1, s2])
+                table_s1, table_s2 = snapshot['s1'], snapshot['s2']
+                flows_s1, flows_s2 = table_s1.output, table_s2.output
+                for vid in evcs:
+                    evc_id = evcs[vid]
+                    api_url = KYTOS_API + '/mef_eline/v2/evc/' + evc_id
+                    response = requests.get(api_url)
+                    assert response.status_code == 200, response.text
+                    evc = response.json()
+                    # should be active
+                    assert evc["active"] is True
+                    # search for the vlan id
+                    assert table_s1.by_vlan(vid), flows_s1
+                    assert table_s2.by_vlan(vid), flows_s2
+                    # search for the cookie, should have three flows:
+                    #  - 2 for the current path
+                    #  - 1 for the failover path
+                    cookie = evc_cookie(evc['id'])
+                    assert len(table_s1.by_cookie(cookie)) == 3, \
+                        f"round={x} - should have 3 flows but had: \n{flows_s1}"
+                    assert len(table_s2.by_cookie(cookie)) == 3, \
+                        f"round={x} - should have 3 flows but had: \n{flows_s2}"
+
+                # Delete the circuits
+                for vid in evcs:
+                    evc_id = evcs[vid]
+                    api_url = KYTOS_API + '/mef_eline/v2/evc/' + evc_id
+                    response = requests.delete(api_url)
+                    assert response.status_code == 200, response.text
+
+                # wait for the flows of the EVCs to be removed
+                monitor.wait_until(
+                    lambda m: not any(m.count(cookie=cookie) for cookie in cookies),
+                    timeout=60, msg=f'round={x} - removal of the EVC flows',
+                )
+
+                # make sure the circuits were deleted
                 api_url = KYTOS_API + '/mef_eline/v2/evc/'
-                response = requests.post(api_url, data=json.dumps(payload), headers={'Content-type': 'application/json'})
-                assert response.status_code == 201, response.text
-                data = response.json()
-                assert 'circuit_id' in data
-                evcs[i] = data['circuit_id']
-
-            time.sleep(10)
-
-            # make sure the evcs are active and the flows were created
-            s1, s2 = self.net.net.get('s1', 's2')
-            flows_s1 = s1.dpctl('dump-flows')
-            flows_s2 = s2.dpctl('dump-flows')
-            for vid in evcs:
-                evc_id = evcs[vid]
-                api_url = KYTOS_API + '/mef_eline/v2/evc/' + evc_id
                 response = requests.get(api_url)
                 assert response.status_code == 200, response.text
-                evc = response.json()
-                # should be active
-                assert evc["active"] is True
-                # search for the vlan id
-                assert "dl_vlan=%s" % vid in flows_s1
-                assert "dl_vlan=%s" % vid in flows_s2
-                # search for the cookie, should have three flows:
-                #  - 2 for the current path
-                #  - 1 for the failover path
-                assert len(re.findall(evc['id'], flows_s1, flags=RE_I)) == 3, \
-                    f"round={x} - should have 3 flows but had: \n{flows_s1}"
-                assert len(re.findall(evc['id'], flows_s2, flags=RE_I)) == 3, \
-                    f"round={x} - should have 3 flows but had: \n{flows_s2}"
-
-            # Delete the circuits
-            for vid in evcs:
-                evc_id = evcs[vid]
-                api_url = KYTOS_API + '/mef_eline/v2/evc/' + evc_id
-                response = requests.delete(api_url)
-                assert response.status_code == 200, response.text
-
-            time.sleep(10)
-
-            # make sure the circuits were deleted
-            api_url = KYTOS_API + '/mef_eline/v2/evc/'
-            response = requests.get(api_url)
-            assert response.status_code == 200, response.text
-            assert response.json() == {}
-            flows_s1 = s1.dpctl('dump-flows')
-            flows_s2 = s2.dpctl('dump-flows')
-            assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS, \
-                f"round={x} - should have {BASIC_FLOWS} flows but had: \n{flows_s1}"
-            assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS, \
-                f"round={x} - should have {BASIC_FLOWS} flows but had: \n{flows_s2}"
+                assert response.json() == {}
+                flows_s1 = s1.dpctl('dump-flows')
+                flows_s2 = s2.dpctl('dump-flows')
+                assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS, \
+                    f"round={x} - should have {BASIC_FLOWS} flows but had: \n{flows_s1}"
+                assert len(flows_s2.split('\r\n ')) == BASIC_FLOWS, \
+                    f"round={x} - should have {BASIC_FLOWS} flows but had: \n{flows_s2}"
 
     def test_085_create_and_remove_ten_circuit_concurrently(self):
         """
@@ -768,13 +795,14 @@ class TestE2EMefEline:
         for thread in threads:
             thread.join()
 
-        # give some time so Kytos can create the flows and everything
-        time.sleep(10)
+        for evc_id in self.evcs.values():
+            wait_evc_deployed(self.net, evc_id, expected=3)
 
         # make sure the evcs are active and the flows were created
         s1, s2 = self.net.net.get('s1', 's2')
-        flows_s1 = s1.dpctl('dump-flows')
-        flows_s2 = s2.dpctl('dump-flows')
+        snapshot = self.net.flow_snapshot([s1, s2])
+        table_s1, table_s2 = snapshot['s1'], snapshot['s2']
+        flows_s1, flows_s2 = table_s1.output, table_s2.output
         for vid in self.evcs:
 
             api_url = KYTOS_API + '/mef_eline/v2/evc/' + self.evcs[vid]
@@ -785,14 +813,15 @@ class TestE2EMefEline:
             assert evc["active"] is True
 
             # search for the vlan id
-            assert "dl_vlan=%s" % vid in flows_s1
-            assert "dl_vlan=%s" % vid in flows_s2
+            assert table_s1.by_vlan(vid), flows_s1
+            assert table_s2.by_vlan(vid), flows_s2
             # search for the cookie, should have three flows:
             #  - 2 for the current path
             #  - 1 for the failover path
-            assert len(re.findall(evc['id'], flows_s1, flags=RE_I)) == 3, \
+            cookie = evc_cookie(evc['id'])
+            assert len(table_s1.by_cookie(cookie)) == 3, \
                 "should have 3 flows but had: \n%s" % flows_s1
-            assert len(re.findall(evc['id'], flows_s2, flags=RE_I)) == 3, \
+            assert len(table_s2.by_cookie(cookie)) == 3, \
                 "should have 3 flows but had: \n%s" % flows_s2
 
         # Delete the circuits
@@ -802,7 +831,8 @@ class TestE2EMefEline:
             response = requests.delete(api_url)
             assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        for evc_id in self.evcs.values():
+            wait_evc_removed(self.net, evc_id, ['s1', 's2'])
 
         # make sure the circuits were deleted
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
@@ -834,7 +864,7 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         # It verifies EVC's new name
         response = requests.get(api_url + evc1)
@@ -856,7 +886,7 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -878,7 +908,7 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -903,7 +933,7 @@ class TestE2EMefEline:
         # It sets a new circuit's end_date
         requests.patch(api_url + evc1, data=json.dumps(payload),
                        headers={'Content-type': 'application/json'})
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -911,7 +941,8 @@ class TestE2EMefEline:
         assert data['end_date'] == end_date.strftime(TIME_FMT)
 
         # waiting to reach the new end timing
-        time.sleep(end_delay*60+5)
+        wait_until(lambda: not evc_active(evc1), timeout=end_delay * 60 + 30,
+                   msg='EVC %s to end' % evc1)
 
         # Verify if the circuit is active
         api_url = KYTOS_API + '/mef_eline/v2/evc/' + evc1
@@ -932,7 +963,7 @@ class TestE2EMefEline:
         # It sets a new circuit's bandwidth
         requests.patch(api_url + evc1, data=json.dumps(payload),
                        headers={'Content-type': 'application/json'})
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -956,7 +987,9 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        wait_until(lambda: all('priority=100' in sw.dpctl('dump-flows')
+                               for sw in self.net.net.get('s1', 's2')),
+                   msg='EVC flows with the new priority')
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -983,7 +1016,9 @@ class TestE2EMefEline:
         requests.patch(api_url + evc1, data=json.dumps(payload),
                        headers={'Content-type': 'application/json'})
 
-        time.sleep(10)
+        wait_until(lambda: all('set_queue:3' in sw.dpctl('dump-flows')
+                               for sw in self.net.net.get('s1', 's2')),
+                   msg='EVC flows with the new queue')
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -1019,7 +1054,7 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -1065,7 +1100,7 @@ class TestE2EMefEline:
                                  headers={'Content-type': 'application/json'})
         data = response.json()
         evc1 = data['circuit_id']
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
         payload2 = {
             "primary_path": [
                 {"endpoint_a": {"id": "00:00:00:00:00:00:00:01:3"},
@@ -1079,7 +1114,7 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -1129,7 +1164,7 @@ class TestE2EMefEline:
         data = response.json()
         evc1 = data['circuit_id']
 
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         payload2 = {
             "backup_path": [
@@ -1142,7 +1177,7 @@ class TestE2EMefEline:
         requests.patch(api_url + evc1, data=json.dumps(payload2),
                        headers={'Content-type': 'application/json'})
 
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -1182,13 +1217,13 @@ class TestE2EMefEline:
         data = response.json()
         evc1 = data['circuit_id']
 
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         # Command to up/down links to test if back-up path is taken
         self.net.net.configLinkStatus('s1', 's2', 'down')
 
-        # Wait just a few seconds to give time to the controller receive and process the linkDown event
-        time.sleep(10)
+        # wait for the controller to process the linkDown event
+        wait_evc_path_avoids(self.net, evc1, 's1', 's2')
 
         current_path = [{"endpoint_a": {"id": "00:00:00:00:00:00:00:01:4"},
                          "endpoint_b": {"id": "00:00:00:00:00:00:00:03:3"}},
@@ -1229,7 +1264,7 @@ class TestE2EMefEline:
         data = response.json()
         evc1 = data['circuit_id']
 
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -1248,8 +1283,8 @@ class TestE2EMefEline:
         # Command to up/down links to test if back-up path is taken
         self.net.net.configLinkStatus('s1', 's2', 'down')
 
-        # Wait just a few seconds to give time to the controller receive and process the linkDown event
-        time.sleep(10)
+        # wait for the controller to process the linkDown event
+        wait_evc_path_avoids(self.net, evc1, 's1', 's2')
 
         current_path = [{"endpoint_a": {"id": "00:00:00:00:00:00:00:01:4"},
                          "endpoint_b": {"id": "00:00:00:00:00:00:00:03:3"}},
@@ -1294,13 +1329,14 @@ class TestE2EMefEline:
         data = response.json()
         evc1 = data['circuit_id']
 
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         # Command to up/down links to test if back-up path is taken
         self.net.net.configLinkStatus('s1', 's2', 'down')
 
-        # Wait just a few seconds to give time to the controller receive and process the linkDown event
-        time.sleep(10)
+        # wait for the controller to process the linkDown event
+        wait_evc_path_avoids(self.net, evc1, 's1', 's2')
+        wait_until(lambda: not evc_active(evc1), msg='EVC %s to be deactivated' % evc1)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -1399,7 +1435,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'])
 
         api_url = KYTOS_API + '/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.get(api_url)
@@ -1449,7 +1485,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'])
 
         api_url = KYTOS_API + '/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.get(api_url)
@@ -1504,7 +1540,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'])
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": "4096/4096"},
@@ -1574,7 +1610,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'])
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": 100},
@@ -1645,7 +1681,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'])
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": "4096/4096"},
@@ -1700,7 +1736,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'])
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": "4096/4096"},
@@ -1750,7 +1786,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'])
 
         expected = {
             "match": {"in_port": 1, "dl_vlan": 0},
@@ -1795,7 +1831,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'])
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": "4096/4096"},
@@ -1854,7 +1890,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'])
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": 100},
@@ -1917,7 +1953,7 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
         data = response.json()
         assert 'circuit_id' in data
-        time.sleep(10)
+        wait_evc_deployed(self.net, data['circuit_id'])
 
         expected = [
             {"match": {"in_port": 1, "dl_vlan": "4096/4096"},
@@ -1982,7 +2018,8 @@ class TestE2EMefEline:
         assert 'circuit_id' in data
         evc_2_id = data["circuit_id"]
 
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc_1_id)
+        wait_evc_deployed(self.net, evc_2_id)
         
         payload = {
             "circuit_ids":[evc_1_id, evc_2_id],
@@ -1,13 +1,13 @@
 import json
-import time
 
 import pytest
 import requests
 
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import (wait_evc_deployed, wait_evc_path_avoids,
+                           wait_topology_ready)
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % (CONTROLLER)
 
 # BasicFlows
 # Each should have at least 3 flows, considering topology 'ring4':
@@ -29,19 +29,19 @@ class TestE2EMefEline:
         # which all elements are disabled in a clean setting
         self.net.restart_kytos_clean()
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name='ring4')
+        cls.net = cls.network_pool.acquire(CONTROLLER, topo_name='ring4')
         cls.net.start()
         cls.net.restart_kytos_clean()
         cls.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def test_005_on_primary_path_fail_should_migrate_to_backup(self):
 
@@ -83,13 +83,15 @@ class TestE2EMefEline:
         response = requests.post(api_url, data=json.dumps(payload), headers={'Content-type': 'application/json'})
         assert response.status_code == 201, response.text
 
-        time.sleep(10)
+        evc1 = response.json()['circuit_id']
+        wait_evc_deployed(self.net, evc1)
 
         # Command to up/down links to test if back-up path is taken
         self.net.net.configLinkStatus('s1', 's2', 'down')
 
-        # Wait just a few seconds to give time to the controller receive and process the linkDown event
-        time.sleep(10)
+        # wait for the controller to process the linkDown event
+        wait_evc_path_avoids(self.net, evc1, 's1', 's2')
+        wait_evc_deployed(self.net, evc1, expected={'s1': 2, 's2': 2, 's3': 2, 's4': 2})
 
         # Check on the virtual switches directly for flows
         s1, s2, s3, s4 = self.net.net.get('s1', 's2', 's3', 's4')
@@ -148,11 +150,14 @@ class TestE2EMefEline:
         r = requests.post(api_url, data=json.dumps(payload), headers={'Content-type': 'application/json'})
         assert r.status_code == 201, r.text
 
-        time.sleep(10)
+        evc1 = r.json()['circuit_id']
+        wait_evc_deployed(self.net, evc1)
 
         # Command to disable links to test if back-up path is taken with the following command:
         self.net.net.configLinkStatus('s1', 's2', 'down')
-        time.sleep(10)
+        # wait for the controller to process the linkDown event
+        wait_evc_path_avoids(self.net, evc1, 's1', 's2')
+        wait_evc_deployed(self.net, evc1, expected={'s1': 2, 's2': 2, 's3': 2, 's4': 2})
 
         # Check on the virtual switches directly for flows
         s1, s2, s3, s4 = self.net.net.get('s1', 's2', 's3', 's4')
@@ -209,11 +214,14 @@ class TestE2EMefEline:
         r = requests.post(api_url, data=json.dumps(payload), headers={'Content-type': 'application/json'})
         assert r.status_code == 201, r.text
 
-        time.sleep(10)
+        evc1 = r.json()['circuit_id']
+        wait_evc_deployed(self.net, evc1)
 
         # Command to disable links to test if back-up path is taken with the following command:
         self.net.net.configLinkStatus('s1', 's2', 'down')
-        time.sleep(10)
+        # wait for the controller to process the linkDown event
+        wait_evc_path_avoids(self.net, evc1, 's1', 's2')
+        wait_evc_deployed(self.net, evc1, expected={'s1': 2, 's2': 2, 's3': 2, 's4': 2})
 
         # Check on the virtual switches directly for flows
         s1, s2, s3, s4 = self.net.net.get('s1', 's2', 's3', 's4')
@@ -260,7 +268,8 @@ class TestE2EMefEline:
         response = requests.post(api_url, data=json.dumps(payload), headers={'Content-type': 'application/json'})
         assert response.status_code == 201, response.text
 
-        time.sleep(10)
+        evc1 = response.json()['circuit_id']
+        wait_evc_deployed(self.net, evc1, expected={'s1': 2})
 
         # Check on the virtual switches directly for flows.
         s1, s2, s3, s4 = self.net.net.get('s1', 's2', 's3', 's4')
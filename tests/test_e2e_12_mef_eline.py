@@ -1,13 +1,12 @@
-import time
 from datetime import datetime, timedelta
 
 import pytest
 import requests
 
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import wait_evc_removed, wait_topology_ready, wait_until
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
 
 TIME_FMT = "%Y-%m-%dT%H:%M:%S+0000"
 
@@ -17,25 +16,29 @@ TIME_FMT = "%Y-%m-%dT%H:%M:%S+0000"
 # - 02 for amlight/coloring (node degree - number of neighbors)
 BASIC_FLOWS = 3
 
+# seconds, on the kytosd clock, for a job scheduled to the next minute to
+# run: set KYTOSD_CLOCK_SPEED to run kytosd under a faster FakeClock
+SCHED_WAIT = 62
+
 class TestE2EMefEline:
     net = None
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = cls.network_pool.acquire(CONTROLLER)
         cls.net.start()
         cls.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     @pytest.fixture()
     def kytos_clean(self):
         self.net.restart_kytos_clean()
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
     @pytest.fixture()
     def circuit_id(self, kytos_clean):
@@ -45,7 +48,7 @@ class TestE2EMefEline:
     @pytest.fixture()
     def disabled_circuit_id(self, circuit_id):
         self._disable_circuit(circuit_id)
-        time.sleep(2)
+        wait_evc_removed(self.net, circuit_id, ['s1'])
         return circuit_id
 
     def _circuit_exists(self, circuit_id):
@@ -53,6 +56,11 @@ class TestE2EMefEline:
         response = requests.get(api_url)
         return response.status_code == 200
 
+    def _circuit_enabled(self, circuit_id):
+        api_url = KYTOS_API + '/mef_eline/v2/evc/' + circuit_id
+        response = requests.get(api_url)
+        return response.status_code == 200 and response.json()['enabled']
+
     def _create_circuit(self):
         payload = {
             "name": "my evc1",
@@ -71,8 +79,8 @@ class TestE2EMefEline:
         data = response.json()
 
         # wait circuit to be created
-        while not self._circuit_exists(data.get('circuit_id')):
-            time.sleep(1)
+        wait_until(lambda: self._circuit_exists(data.get('circuit_id')),
+                   msg='circuit to be created')
 
         return data.get('circuit_id')
 
@@ -112,8 +120,9 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
 
         # waiting some time to trigger the scheduler
-        sched_wait = 62
-        time.sleep(sched_wait)
+        wait_until(lambda: self._circuit_enabled(disabled_circuit_id),
+                   timeout=self.net.controller_timeout(SCHED_WAIT),
+                   msg='scheduler to enable the circuit')
 
         # Verify if the circuit is enabled 
         api_url = KYTOS_API + '/mef_eline/v2/evc/' + disabled_circuit_id
@@ -133,7 +142,7 @@ class TestE2EMefEline:
             after one minute. """
 
         # Schedule by date to next minute
-        ts = datetime.utcnow() + timedelta(seconds=60)
+        ts = self.net.controller_now() + timedelta(seconds=60)
         schedule_time = ts.strftime("%Y-%m-%dT%H:%M:%S.000Z")
 
         payload = {
@@ -155,8 +164,9 @@ class TestE2EMefEline:
         assert response.status_code == 201, response.text
 
         # waiting some time to trigger the scheduler
-        sched_wait = 62
-        time.sleep(sched_wait)
+        wait_until(lambda: self._circuit_enabled(disabled_circuit_id),
+                   timeout=self.net.controller_timeout(SCHED_WAIT),
+                   msg='scheduler to enable the circuit')
 
         # Verify if the circuit is enabled 
         api_url = KYTOS_API + '/mef_eline/v2/evc/' + disabled_circuit_id
@@ -252,8 +262,9 @@ class TestE2EMefEline:
         assert response.status_code == 200, response.text
 
         # waiting to trigger the scheduler
-        sched_wait = 62
-        time.sleep(sched_wait)
+        wait_until(lambda: self._circuit_enabled(disabled_circuit_id),
+                   timeout=self.net.controller_timeout(SCHED_WAIT),
+                   msg='scheduler to enable the circuit')
 
         # Verify if the circuit is enabled
         api_url = KYTOS_API + '/mef_eline/v2/evc/' + disabled_circuit_id
@@ -307,8 +318,6 @@ class TestE2EMefEline:
         response = requests.patch(api_url + circuit_id, json=payload)
         assert response.status_code == 400, response.text
 
-        time.sleep(10)
-
         # It gets EVC's data
         response = requests.get(api_url + circuit_id)
         data = response.json()
@@ -350,8 +359,6 @@ class TestE2EMefEline:
         response = requests.patch(api_url + schedule_id, json=payload2)
         assert response.status_code == 200, response.text
 
-        time.sleep(10)
-
         # It verifies EVC's data
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
         response = requests.get(api_url + disabled_circuit_id)
@@ -365,8 +372,7 @@ class TestE2EMefEline:
         api_url = KYTOS_API + '/mef_eline/v2/evc/' + circuit_id
         response = requests.delete(api_url)
         assert response.status_code == 200, response.text
-
-        time.sleep(10)
+        wait_evc_removed(self.net, circuit_id, ['s1'])
 
         # Verify circuit removal by
         # listing all the circuits stored
@@ -1,14 +1,13 @@
 import json
-import time
 from datetime import datetime
 
 import pytest
 import requests
 
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import wait_evc_deployed, wait_topology_ready
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
 
 TIME_FMT = "%Y-%m-%dT%H:%M:%S+0000"
 
@@ -28,19 +27,19 @@ class TestE2EMefEline:
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = cls.network_pool.acquire(CONTROLLER)
         cls.net.start()
         cls.net.restart_kytos_clean()
         cls.net.wait_switches_connect()
-        time.sleep(5)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def create_evc(self, vlan_id, store=False):
         payload = {
@@ -61,14 +60,13 @@ class TestE2EMefEline:
         data = response.json()
         if store:
             self.evcs[vlan_id] = data['circuit_id']
+        wait_evc_deployed(self.net, data['circuit_id'])
         return data['circuit_id']
 
     def test_005_patch_unknown_circuit(self):
         api_url = KYTOS_API + '/mef_eline/v2/evc/'
         evc1 = self.create_evc(100)
 
-        time.sleep(10)
-
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
         data = response.json()
@@ -440,7 +438,6 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -488,7 +485,6 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -534,8 +530,6 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
 
-        time.sleep(10)
-
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
         data = response.json()
@@ -582,7 +576,6 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -634,7 +627,6 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -682,7 +674,6 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -730,7 +721,6 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -784,7 +774,6 @@ class TestE2EMefEline:
         response = requests.patch(api_url + evc1, data=json.dumps(payload2),
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
-        time.sleep(10)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
@@ -839,8 +828,6 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
 
-        time.sleep(10)
-
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
         data = response.json()
@@ -872,8 +859,6 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
 
-        time.sleep(10)
-
         response = requests.get(api_url + evc1)
         data = response.json()
         assert data['creation_time'] == creation_time
@@ -935,8 +920,7 @@ class TestE2EMefEline:
                                  headers={'Content-type': 'application/json'})
         data = response.json()
         evc1 = data['circuit_id']
-
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         payload2 = {
             "current_path": [
@@ -963,8 +947,6 @@ class TestE2EMefEline:
                                   headers={'Content-type': 'application/json'})
         assert response.status_code == 400, response.text
 
-        time.sleep(10)
-
         # It verifies EVC's current_path
         response = requests.get(api_url + evc1)
         data = response.json()
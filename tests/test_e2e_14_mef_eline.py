@@ -1,12 +1,10 @@
-import time
-
 import pytest
 import requests
 
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import wait_evc_deployed, wait_topology_ready
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
 
 class TestE2EMefEline:
     net = None
@@ -22,28 +20,27 @@ class TestE2EMefEline:
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name='amlight')
+        cls.net = cls.network_pool.acquire(CONTROLLER, topo_name='amlight')
         cls.net.start()
         cls.net.restart_kytos_clean()
         cls.net.wait_switches_connect()
-        time.sleep(5)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def restart(self, _clean_config=False, _enable_all=True):
         # Start the controller setting an environment in which the setting is
         # preserved (persistence) and avoid the default enabling of all elements
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
         self.net.wait_switches_connect()
-
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(10)
+        if _enable_all:
+            wait_topology_ready(self.net)
 
     def create_evc(self, uni_a="00:00:00:00:00:00:00:01:1", uni_z="00:00:00:00:00:00:00:02:1", vlan_id=100):
         payload = {
@@ -75,8 +72,7 @@ class TestE2EMefEline:
         evc1 = self.create_evc(uni_a='00:00:00:00:00:00:00:16:5',
                                uni_z='00:00:00:00:00:00:00:11:1',
                                vlan_id=100)
-
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc1)
 
         # It verifies EVC's data
         response = requests.get(api_url + evc1)
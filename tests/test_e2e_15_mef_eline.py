@@ -1,13 +1,13 @@
 import json
-import time
 import random
 
 import requests
 
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import (evc_protected, wait_evc_deployed, wait_topology_ready,
+                           wait_until)
 
 CONTROLLER = "127.0.0.1"
-KYTOS_API = "http://%s:8181/api/kytos" % CONTROLLER
 
 
 class TestE2EMefEline:
@@ -19,25 +19,25 @@ class TestE2EMefEline:
         """
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name="ring")
+        cls.net = cls.network_pool.acquire(CONTROLLER, topo_name="ring")
         cls.net.start()
         cls.net.restart_kytos_clean()
         cls.net.wait_switches_connect()
-        time.sleep(5)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def restart(self, _clean_config=False, _enable_all=True):
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
         self.net.wait_switches_connect()
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(10)
+        if _enable_all:
+            wait_topology_ready(self.net)
 
     def add_topology_metadata(self):
         """Add topology metadata."""
@@ -115,7 +115,7 @@ class TestE2EMefEline:
             uni_z="00:00:00:00:00:00:00:03:1",
             vlan_id=100,
         )
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc_id)
         response = requests.get(api_url + evc_id)
         data = response.json()
         assert data["enabled"]
@@ -129,7 +129,7 @@ class TestE2EMefEline:
                 "tag": {"tag_type": 1, "value": 100}
             },
         )
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc_id, ['s2'])
         response = requests.get(api_url + evc_id)
         data = response.json()
         assert data["uni_z"]["interface_id"] == "00:00:00:00:00:00:00:02:1"
@@ -168,8 +168,8 @@ class TestE2EMefEline:
                 "mandatory_metrics": {"ownership": "blue"}
             },
         )
-
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc_id)
+        wait_until(lambda: evc_protected(evc_id), msg='EVC %s failover path' % evc_id)
         response = requests.get(api_url + evc_id)
         data = response.json()
         assert data["enabled"]
@@ -202,7 +202,8 @@ class TestE2EMefEline:
                 "spf_attribute": "hop",
             },
         )
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc_id)
+        wait_until(lambda: evc_protected(evc_id), msg='EVC %s failover path' % evc_id)
         response = requests.get(api_url + evc_id)
         data = response.json()
         assert data["enabled"]
@@ -495,9 +496,8 @@ class TestE2EMefEline:
         assert response.status_code == 200, response.text
         assert expected == data[intf_id]["available_tags"]["vlan"]
 
-        time.sleep(10)
-
         # Flows created with masks, 12/4092, 16/4092, 20/4094
+        wait_evc_deployed(self.net, circuit_id, expected={'s1': 5, 's2': 5})
         s1, s2 = self.net.net.get('s1', 's2')
         flows_s1 = s1.dpctl('dump-flows')
         flows_s2 = s2.dpctl('dump-flows')
@@ -1,13 +1,13 @@
 import json
-import time
 import random
 
 import requests
 
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import (evc_protected, wait_evc_deployed, wait_topology_ready,
+                           wait_until)
 
 CONTROLLER = "127.0.0.1"
-KYTOS_API = "http://%s:8181/api/kytos" % CONTROLLER
 
 
 class TestE2EMefEline:
@@ -19,25 +19,25 @@ class TestE2EMefEline:
         """
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name="ring")
+        cls.net = cls.network_pool.acquire(CONTROLLER, topo_name="ring")
         cls.net.start()
         cls.net.restart_kytos_clean()
         cls.net.wait_switches_connect()
-        time.sleep(5)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def restart(self, _clean_config=False, _enable_all=True):
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
         self.net.wait_switches_connect()
-        # Wait a few seconds to kytos execute LLDP
-        time.sleep(10)
+        if _enable_all:
+            wait_topology_ready(self.net)
 
     def add_topology_metadata(self):
         """Add topology metadata."""
@@ -131,8 +131,8 @@ class TestE2EMefEline:
                 "mandatory_metrics": {"not_ownership": ["blue"]}
             },
         )
-
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc_id)
+        wait_until(lambda: evc_protected(evc_id), msg='EVC %s failover path' % evc_id)
         response = requests.get(api_url + evc_id)
         data = response.json()
         assert data["enabled"]
@@ -165,7 +165,8 @@ class TestE2EMefEline:
                 "spf_attribute": "hop",
             },
         )
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc_id)
+        wait_until(lambda: evc_protected(evc_id), msg='EVC %s failover path' % evc_id)
         response = requests.get(api_url + evc_id)
         data = response.json()
         assert data["enabled"]
@@ -1,12 +1,11 @@
 import json
-import time
 
 import requests
 
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import wait_topology_ready, wait_until
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
 
 # BasicFlows
 # Each should have at least 3 flows, considering topology 'ring':
@@ -22,22 +21,45 @@ class TestE2EFlowManager:
         """
         It is called at the beginning of every class method execution
         """
-        # Start the controller setting an environment in
-        # which all elements are disabled in a clean setting
-        self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        # Start the controller from the state of a clean start with all
+        # elements enabled, restoring its database and baseline flows
+        self.net.restart_kytos_baseline()
+        wait_topology_ready(self.net)
+        # follow the flows of the switches during the test
+        self.monitor = self.net.monitor_flows()
+
+    def teardown_method(self, method):
+        self.monitor.stop()
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = cls.network_pool.acquire(CONTROLLER)
         cls.net.start()
         cls.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
+
+    def restart_and_wait_flows(self, switches, expected, cookie=None):
+        """Restart kytos deleting the flows of the switches, and wait until
+        it installs them again: a flow with `cookie` (any by default) is
+        added back and each switch has `expected` flows."""
+        additions = {name: self.monitor.additions(name, cookie) for name in switches}
+        self.net.start_controller(enable_all=True, del_flows=True)
+        self.net.wait_switches_connect()
+        self.monitor.wait_until(
+            lambda m: all(m.additions(name, cookie) > additions[name]
+                          and m.count(name) == expected for name in switches),
+            msg='%s flows reinstalled on %s' % (expected, ', '.join(switches)),
+        )
+
+    def wait_consistent(self, sw):
+        """Wait for the consistency check to bring the flows of the switch
+        back to the ones stored on flow_manager."""
+        wait_until(lambda: self.net.flow_consistency([sw])[sw.name].consistent,
+                   msg=f'{sw.name} flows to match flow_manager')
 
     def test_005_install_flow(self):
         """Tests if, after kytos restart, a flow installed
@@ -72,13 +94,10 @@ class TestE2EFlowManager:
         assert 'FlowMod Messages Sent' in data['response']
 
         # wait for the flow to be installed
-        time.sleep(10)
+        self.monitor.wait_until(lambda m: m.count('s1', cookie) == 1, msg='flow on s1')
 
         # restart controller keeping configuration
-        self.net.start_controller(enable_all=True, del_flows=True)
-        self.net.wait_switches_connect()
-
-        time.sleep(10)
+        self.restart_and_wait_flows(['s1'], BASIC_FLOWS + 1, cookie=cookie)
 
         # Make sure that the flow that was sent is on /v2/stored_flows
         dpid = "00:00:00:00:00:00:00:01"
@@ -133,13 +152,10 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(10)
+        self.monitor.wait_until(lambda m: m.count('s1', 0) == 1, msg='flow on s1')
 
         # restart controller keeping configuration
-        self.net.start_controller(enable_all=True, del_flows=True)
-        self.net.wait_switches_connect()
-
-        time.sleep(10)
+        self.restart_and_wait_flows(['s1'], BASIC_FLOWS + 1, cookie=0)
 
         sw_name = "s1"
         sw = self.net.net.get(sw_name)
@@ -189,13 +205,13 @@ class TestE2EFlowManager:
         assert 'FlowMod Messages Sent' in data['response']
 
         # wait for the flow to be installed
-        time.sleep(10)
+        self.monitor.wait_until(
+            lambda m: all(m.count(name, 0) == 1 for name in ('s1', 's2', 's3')),
+            msg='flow on s1, s2 and s3',
+        )
 
         # restart controller keeping configuration
-        self.net.start_controller(enable_all=True, del_flows=True)
-        self.net.wait_switches_connect()
-
-        time.sleep(10)
+        self.restart_and_wait_flows(['s1', 's2', 's3'], BASIC_FLOWS + 1, cookie=0)
 
         for sw_name in ['s1', 's2', 's3']:
             sw = self.net.net.get(sw_name)
@@ -283,14 +299,14 @@ class TestE2EFlowManager:
         requests.post(api_url, data=json.dumps(payload),
                       headers={'Content-type': 'application/json'})
 
-        # wait for the flow to be installed
-        time.sleep(10)
+        # wait for the flows to be installed
+        self.monitor.wait_until(
+            lambda m: all(m.count('s1', cookie) == 1 for cookie in (1, 2, 3)),
+            msg='flows on s1',
+        )
 
         # restart controller keeping configuration
-        self.net.start_controller(enable_all=True, del_flows=True)
-        self.net.wait_switches_connect()
-
-        time.sleep(10)
+        self.restart_and_wait_flows(['s1'], BASIC_FLOWS + 3, cookie=1)
 
         stored_flows = f'{KYTOS_API}/flow_manager/v2/stored_flows/?dpids={switch_id}&cookie_range=1&cookie_range=3'
         response = requests.get(stored_flows)
@@ -328,7 +344,7 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(10)
+        self.monitor.wait_until(lambda m: m.count('s1', 0) == 1, msg='flow on s1')
 
         # delete the flow
         api_url = KYTOS_API + '/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
@@ -339,13 +355,10 @@ class TestE2EFlowManager:
         assert 'FlowMod Messages Sent' in data['response']
 
         # wait for the flow to be deleted
-        time.sleep(10)
+        self.monitor.wait_until(lambda m: m.count('s1', 0) == 0, msg='flow deleted from s1')
 
         # restart controller keeping configuration
-        self.net.start_controller(enable_all=True, del_flows=True)
-        self.net.wait_switches_connect()
-
-        time.sleep(10)
+        self.restart_and_wait_flows(['s1'], BASIC_FLOWS)
 
         s1 = self.net.net.get('s1')
         flows_s1 = s1.dpctl('dump-flows')
@@ -380,7 +393,10 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(10)
+        self.monitor.wait_until(
+            lambda m: all(m.count(name, 0) == 1 for name in ('s1', 's2', 's3')),
+            msg='flow on s1, s2 and s3',
+        )
 
         # delete the flow
         api_url = KYTOS_API + '/flow_manager/v2/flows'
@@ -391,13 +407,13 @@ class TestE2EFlowManager:
         assert 'FlowMod Messages Sent' in data['response']
 
         # wait for the flow to be deleted
-        time.sleep(10)
+        self.monitor.wait_until(
+            lambda m: m.count(cookie=0) == 0,
+            msg='flow deleted from s1, s2 and s3',
+        )
 
         # restart controller keeping configuration
-        self.net.start_controller(enable_all=True, del_flows=True)
-        self.net.wait_switches_connect()
-
-        time.sleep(10)
+        self.restart_and_wait_flows(['s1', 's2', 's3'], BASIC_FLOWS)
 
         # Make sure that flows are soft deleted on /v2/stored_flows
         response = requests.get(
@@ -470,7 +486,11 @@ class TestE2EFlowManager:
         assert response.status_code == 202, response.text
 
         # wait for the flows to be installed
-        time.sleep(10)
+        cookies = [flow["cookie"] for flow in payload["flows"]]
+        self.monitor.wait_until(
+            lambda m: all(m.count('s1', cookie) == 1 for cookie in cookies),
+            msg='flows on s1',
+        )
 
         # it's expected to match all 0xaa cookie prefix
         delete_payload = {
@@ -491,13 +511,13 @@ class TestE2EFlowManager:
         assert 'FlowMod Messages Sent' in data['response']
 
         # wait for the flows to be deleted
-        time.sleep(10)
+        self.monitor.wait_until(
+            lambda m: not any(m.count('s1', cookie) for cookie in cookies),
+            msg='flows deleted from s1',
+        )
 
         # restart controller keeping configuration
-        self.net.start_controller(enable_all=True, del_flows=True)
-        self.net.wait_switches_connect()
-
-        time.sleep(10)
+        self.restart_and_wait_flows(['s1'], BASIC_FLOWS)
 
         # Make sure that flows are soft deleted on /v2/stored_flows
         response = requests.get(
@@ -579,7 +599,11 @@ class TestE2EFlowManager:
         assert response.status_code == 202, response.text
 
         # wait for the flows to be installed
-        time.sleep(10)
+        cookies = [flow["cookie"] for flow in payload["flows"]]
+        self.monitor.wait_until(
+            lambda m: all(m.count('s1', cookie) == 1 for cookie in cookies),
+            msg='flows on s1',
+        )
 
         # cookie mask all 0's means match any
         delete_payload = {
@@ -600,7 +624,7 @@ class TestE2EFlowManager:
         assert 'FlowMod Messages Sent' in data['response']
 
         # wait for the flows to be deleted
-        time.sleep(10)
+        self.monitor.wait_until(lambda m: m.count('s1') == 0, msg='flows deleted from s1')
 
         # Make sure that flows are soft deleted on /v2/stored_flows
         response = requests.get(
@@ -663,7 +687,11 @@ class TestE2EFlowManager:
         assert response.status_code == 202, response.text
 
         # wait for the flows to be installed
-        time.sleep(10)
+        cookies = [flow["cookie"] for flow in payload["flows"]]
+        self.monitor.wait_until(
+            lambda m: all(m.count('s1', cookie) == 1 for cookie in cookies),
+            msg='flows on s1',
+        )
 
         # it's expected to match [0xaa00000000000000, 0xaa00000000000001]
         delete_payload = {
@@ -683,7 +711,10 @@ class TestE2EFlowManager:
         data = response.json()
         assert 'FlowMod Messages Sent' in data['response']
         # wait for the flow to be deleted
-        time.sleep(10)
+        self.monitor.wait_until(
+            lambda m: m.count('s1', 0xaa00000000000001) == 0,
+            msg='flow deleted from s1',
+        )
 
         # Make sure that only one flow got soft deleted on /v2/stored_flows
         response = requests.get(
@@ -740,7 +771,7 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(10)
+        self.monitor.wait_until(lambda m: m.count('s1', 0) == 1, msg='flow on s1')
 
         s1 = self.net.net.get('s1')
         s1.dpctl('del-flows', 'in_port=1')
@@ -753,7 +784,7 @@ class TestE2EFlowManager:
         else:
             self.net.reconnect_switches()
 
-        time.sleep(10)
+        self.wait_consistent(s1)
 
         s1 = self.net.net.get('s1')
         flows_s1 = s1.dpctl('dump-flows')
@@ -792,7 +823,7 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(10)
+        self.monitor.wait_until(lambda m: m.count('s1', 0) == 1, msg='flow on s1')
 
         # Verify the flow
         s1 = self.net.net.get('s1')
@@ -813,7 +844,7 @@ class TestE2EFlowManager:
         else:
             self.net.reconnect_switches()
 
-        time.sleep(10)
+        self.wait_consistent(s1)
 
         # Check that the flow keeps the original setting
         s1 = self.net.net.get('s1')
@@ -851,7 +882,7 @@ class TestE2EFlowManager:
                       headers={'Content-type': 'application/json'})
 
         # wait for the flow to be installed
-        time.sleep(10)
+        self.monitor.wait_until(lambda m: m.count('s1', 0) == 1, msg='flow on s1')
 
         # Verify the flow
         s1 = self.net.net.get('s1')
@@ -868,7 +899,7 @@ class TestE2EFlowManager:
         else:
             self.net.reconnect_switches()
 
-        time.sleep(10)
+        self.wait_consistent(s1)
 
         flows_s1 = s1.dpctl('dump-flows')
         assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
@@ -894,7 +925,7 @@ class TestE2EFlowManager:
         else:
             self.net.reconnect_switches()
 
-        time.sleep(10)
+        self.wait_consistent(s1)
 
         s1 = self.net.net.get('s1')
         flows_s1 = s1.dpctl('dump-flows')
@@ -920,7 +951,7 @@ class TestE2EFlowManager:
         else:
             self.net.reconnect_switches()
 
-        time.sleep(10)
+        self.wait_consistent(s1)
 
         s1 = self.net.net.get('s1')
         flows_s1 = s1.dpctl('dump-flows')
@@ -4,10 +4,10 @@ import time
 
 import requests
 
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import wait_topology_ready
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
 
 # BasicFlows
 # Each should have at least 3 flows, considering topology 'ring':
@@ -27,18 +27,18 @@ class TestE2EFlowManager:
         # which all elements are disabled in a clean setting
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = cls.network_pool.acquire(CONTROLLER)
         cls.net.start()
         cls.net.wait_switches_connect()
         time.sleep(10)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def test_030_restart_kytos_should_preserve_flows(self):
         """Test if, after kytos restart, the flows are preserved on the switch
@@ -93,6 +93,10 @@ class TestE2EFlowManager:
             duration = float(match.group(1))
             assert duration + 1 >= wait_time + delta
 
+        # the switches have exactly the flows flow_manager stored as installed
+        diffs = self.net.flow_consistency()
+        assert all(diff.consistent for diff in diffs.values()), diffs
+
     def test_031_on_switch_restart_kytos_should_recreate_flows(self):
         """Test if, after kytos restart, the flows are preserved on the switch 
            flow table."""
@@ -139,6 +143,10 @@ class TestE2EFlowManager:
         assert len(flows_s1.split('\r\n ')) == BASIC_FLOWS + 1, flows_s1
         assert 'dl_vlan=999' in flows_s1
 
+        # the switches have exactly the flows flow_manager stored as installed
+        diffs = self.net.flow_consistency()
+        assert all(diff.consistent for diff in diffs.values()), diffs
+
     def test_032_on_switch_reconnection_should_recreate_untagged_any_flows(self):
         """Test if, after kytos restart, deserialize properly"""
 
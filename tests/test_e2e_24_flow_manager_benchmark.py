@@ -0,0 +1,125 @@
+import os
+import time
+
+import pytest
+import requests
+
+from tests.benchmarks import (ResourceSampler, generate_flow, installed_count,
+                              summarize, write_results)
+from tests.waiters import dpid_from_switch, wait_topology_ready, wait_until
+from tests.workers import KYTOS_API
+
+CONTROLLER = '127.0.0.1'
+
+FLOW_COUNTS = [int(n) for n in
+               os.environ.get('BENCHMARK_FLOW_COUNTS', '1000,10000,100000').split(',')]
+BATCH_SIZES = [int(n) for n in
+               os.environ.get('BENCHMARK_BATCH_SIZES', '100,1000').split(',')]
+
+
+@pytest.mark.benchmark
+class TestE2EFlowManagerBenchmark:
+    """Push batches of generated flows to flow_manager and measure how long
+    they take to show up on the switches, and what it costs to kytosd."""
+
+    net = None
+    results = []
+
+    @classmethod
+    def setup_class(cls):
+        cls.net = cls.network_pool.acquire(CONTROLLER)
+        cls.net.start()
+        cls.net.restart_kytos_baseline()
+        wait_topology_ready(cls.net)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.network_pool.release(cls.net)
+
+    def setup_method(self, method):
+        self.net.restart_kytos_baseline()
+        wait_topology_ready(self.net)
+
+    def install(self, switches, count, batch_size):
+        """Install `count` flows spread over the switches and return the
+        measures."""
+        per_switch = {sw.name: [] for sw in switches}
+        for i in range(count):
+            per_switch[switches[i % len(switches)].name].append(generate_flow(i))
+        # batches are sent to the switches in turns
+        batches = []
+        for offset in range(0, max(map(len, per_switch.values())), batch_size):
+            for sw in switches:
+                flows = per_switch[sw.name][offset:offset + batch_size]
+                if flows:
+                    batches.append((sw, flows))
+
+        pid = self.net.controller_pid()
+        with self.net.monitor_flows(switches) as monitor, \
+                ResourceSampler(pid) as resources:
+            accepted = []
+            started_at = time.monotonic()
+            for sw, flows in batches:
+                api_url = KYTOS_API + '/flow_manager/v2/flows/' + dpid_from_switch(sw)
+                posted_at = time.monotonic()
+                response = requests.post(api_url, json={"flows": flows})
+                assert response.status_code == 202, response.text
+                accepted.append((sw.name, flows, posted_at, time.monotonic()))
+            posted = time.monotonic()
+
+            expected = {sw.name: len(per_switch[sw.name]) for sw in switches}
+            wait_until(
+                lambda: all(installed_count(sw) >= expected[sw.name] for sw in switches),
+                timeout=max(120, count / 50), interval=0.1,
+                msg=f'{count} flows on {len(switches)} switches',
+            )
+            finished_at = time.monotonic()
+            # cookie -> time the flow was added, per switch
+            added_at = {
+                name: {m.flows[key].cookie: at for key, at in m.added_at.items()}
+                for name, m in monitor.monitors.items()
+            }
+
+        batch_latency, post_latency = [], []
+        for name, flows, posted_at, accepted_at in accepted:
+            times = [added_at[name].get(flow['cookie']) for flow in flows]
+            post_latency.append(accepted_at - posted_at)
+            if None not in times:
+                batch_latency.append(max(times) - accepted_at)
+        last_accepted_at = accepted[-1][3]
+        return {
+            'flows': count,
+            'switches': len(switches),
+            'batch_size': batch_size,
+            'batches': len(batches),
+            # first POST -> last 202
+            'post_seconds': posted - started_at,
+            # last 202 -> every flow visible on the switches
+            'install_seconds': finished_at - last_accepted_at,
+            # first POST -> every flow visible on the switches
+            'total_seconds': finished_at - started_at,
+            'flow_mods_per_second': count / (finished_at - started_at),
+            'post_latency': summarize(post_latency),
+            'batch_latency': summarize(batch_latency),
+            'controller': resources.result(),
+        }
+
+    @pytest.mark.parametrize('batch_size', BATCH_SIZES)
+    @pytest.mark.parametrize('count', FLOW_COUNTS)
+    @pytest.mark.parametrize('scope', ['switch', 'fabric'])
+    def test_install_flows(self, scope, count, batch_size):
+        if batch_size > count:
+            pytest.skip('batch larger than the number of flows')
+        switches = self.net.net.switches
+        if scope == 'switch':
+            switches = switches[:1]
+        result = self.install(switches, count, batch_size)
+        result['scope'] = scope
+        self.results.append(result)
+        print("%(scope)s: %(flows)s flows in batches of %(batch_size)s: "
+              "%(total_seconds).1fs, installed %(install_seconds).1fs after the "
+              "last 202, %(flow_mods_per_second).0f FlowMods/s" % result)
+
+    def test_999_save_results(self, benchmark_dir):
+        path = write_results(benchmark_dir, 'flow_manager_install', self.results)
+        print(f"results saved to {path}")
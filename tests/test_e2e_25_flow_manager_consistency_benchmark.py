@@ -0,0 +1,160 @@
+import os
+import random
+import tempfile
+import time
+
+import pytest
+import requests
+
+from tests.benchmarks import (COOKIE_BASE, COOKIE_MASK, ResourceSampler,
+                              flow_count, generate_flow, installed_count,
+                              write_results)
+from tests.timer_profiles import TIMER_PROFILES
+from tests.waiters import dpid_from_switch, wait_topology_ready, wait_until
+from tests.workers import KYTOS_API
+
+CONTROLLER = '127.0.0.1'
+
+TABLE_SIZES = [int(n) for n in
+               os.environ.get('BENCHMARK_CONSISTENCY_SIZES', '100,1000,10000,100000').split(',')]
+# flows injected on the switch behind the controller's back
+ALIEN_FLOWS = int(os.environ.get('BENCHMARK_ALIEN_FLOWS', 10))
+MISSING_FLOWS = int(os.environ.get('BENCHMARK_MISSING_FLOWS', 10))
+MODIFIED_FLOWS = int(os.environ.get('BENCHMARK_MODIFIED_FLOWS', 10))
+
+# cookies of the alien flows, none of them in the flow_manager
+# CONSISTENCY_COOKIE_IGNORED_RANGE, so the consistency check removes them
+ALIEN_COOKIE = 0xcc00000000000000
+BATCH_SIZE = 1000
+
+
+def ovs_match(i):
+    """OVS syntax of the match of generate_flow(i)."""
+    return 'priority=100,in_port=1,ip,nw_dst=10.%d.%d.%d' % (
+        (i >> 16) & 255, (i >> 8) & 255, i & 255)
+
+
+def apply_flows(sw, lines):
+    """Apply flow changes with a single `add-flows`; each line may start
+    with add, modify_strict or delete_strict."""
+    with tempfile.NamedTemporaryFile('w', suffix='.flows', delete=False) as f:
+        f.write('\n'.join(lines) + '\n')
+    try:
+        result = sw.dpctl('add-flows', f.name)
+    finally:
+        os.unlink(f.name)
+    assert not result.strip(), result
+
+
+@pytest.mark.benchmark
+class TestE2EFlowManagerConsistencyBenchmark:
+    """Make a switch diverge from flow_manager with alien, missing and
+    modified flows and measure how long the consistency check takes to
+    bring it back, and its CPU cost."""
+
+    net = None
+    results = []
+
+    @classmethod
+    def setup_class(cls):
+        cls.net = cls.network_pool.acquire(CONTROLLER)
+        cls.net.start()
+        cls.net.restart_kytos_baseline()
+        wait_topology_ready(cls.net)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.network_pool.release(cls.net)
+
+    def setup_method(self, method):
+        self.net.restart_kytos_baseline()
+        wait_topology_ready(self.net)
+
+    def install(self, sw, size):
+        api_url = KYTOS_API + '/flow_manager/v2/flows/' + dpid_from_switch(sw)
+        for offset in range(0, size, BATCH_SIZE):
+            flows = [generate_flow(i) for i in range(offset, min(size, offset + BATCH_SIZE))]
+            response = requests.post(api_url, json={"flows": flows})
+            assert response.status_code == 202, response.text
+        wait_until(lambda: installed_count(sw) >= size, timeout=max(120, size / 50),
+                   interval=0.1, msg=f'{size} flows on {sw.name}')
+
+    def inject(self, sw, size):
+        """Add alien flows, delete and modify generated flows on the switch."""
+        rng = random.Random(size)
+        changed = rng.sample(range(size), min(size, MISSING_FLOWS + MODIFIED_FLOWS))
+        missing, modified = changed[:MISSING_FLOWS], changed[MISSING_FLOWS:]
+        lines = [
+            'add cookie=%#x,priority=100,in_port=1,ip,nw_dst=11.%d.%d.%d,actions=drop'
+            % (ALIEN_COOKIE + j, (j >> 16) & 255, (j >> 8) & 255, j & 255)
+            for j in range(ALIEN_FLOWS)
+        ]
+        lines += ['delete_strict ' + ovs_match(i) for i in missing]
+        lines += ['modify_strict %s,actions=output:3' % ovs_match(i) for i in modified]
+        if lines:
+            apply_flows(sw, lines)
+        assert self.diverged(sw, size) == {
+            'alien': ALIEN_FLOWS, 'missing': len(missing), 'modified': len(modified),
+        }
+        return len(missing), len(modified)
+
+    @staticmethod
+    def diverged(sw, size):
+        """Return how many alien, missing and modified flows the switch
+        has."""
+        return {
+            'alien': flow_count(sw, 'cookie=%#x/%#x' % (ALIEN_COOKIE, COOKIE_MASK)),
+            'missing': max(0, size - installed_count(sw)),
+            'modified': flow_count(sw, 'cookie=%#x/%#x,out_port=3'
+                                   % (COOKIE_BASE, COOKIE_MASK)),
+        }
+
+    def converge(self, sw, size, timeout):
+        """Wait until each kind of divergence is gone; return the seconds
+        each one took."""
+        started_at = time.monotonic()
+        converged = {}
+
+        def done():
+            for kind, count in self.diverged(sw, size).items():
+                if kind not in converged and not count:
+                    converged[kind] = time.monotonic() - started_at
+            return len(converged) == 3
+
+        wait_until(done, timeout=timeout, interval=0.1, max_interval=0.5,
+                   msg=f'{sw.name} to converge')
+        return converged
+
+    @pytest.mark.parametrize('size', TABLE_SIZES)
+    def test_converge_after_injection(self, size):
+        sw = self.net.net.get('s1')
+        self.install(sw, size)
+        missing, modified = self.inject(sw, size)
+
+        with ResourceSampler(self.net.controller_pid()) as resources:
+            triggered_at = time.monotonic()
+            # the consistency check runs after the handshake
+            self.net.reconnect_switches()
+            converged = self.converge(sw, size, timeout=max(300, size / 50))
+            total = time.monotonic() - triggered_at
+
+        # flows the consistency check leaves alone are not compared either
+        ignored_cookies = TIMER_PROFILES.setting(
+            'flow_manager', 'CONSISTENCY_COOKIE_IGNORED_RANGE')
+        diffs = self.net.flow_consistency([sw], ignored_cookies=ignored_cookies)
+        assert diffs[sw.name].consistent, diffs[sw.name]
+
+        result = {
+            'table_size': size,
+            'injected': {'alien': ALIEN_FLOWS, 'missing': missing, 'modified': modified},
+            'convergence_seconds': converged,
+            'total_seconds': total,
+            'controller': resources.result(),
+        }
+        self.results.append(result)
+        print("%s flows: converged in %.1fs, kytosd CPU %.1fs" % (
+            size, total, result['controller']['cpu_seconds']))
+
+    def test_999_save_results(self, benchmark_dir):
+        path = write_results(benchmark_dir, 'flow_manager_consistency', self.results)
+        print(f"results saved to {path}")
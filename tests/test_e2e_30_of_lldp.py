@@ -1,9 +1,9 @@
 import requests
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import wait_topology_ready
 import time
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
 
 
 class TestE2EOfLLDP:
@@ -11,15 +11,15 @@ class TestE2EOfLLDP:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = cls.network_pool.acquire(CONTROLLER)
         cls.net.start()
         cls.net.restart_kytos_clean()
         cls.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def get_iface_stats_rx_pkt(self, host):
         rx_pkts = host.cmd("ip -s link show dev %s | grep RX: -A 1 | tail -n1 | awk '{print $2}'" % (host.intfNames()[0]))
@@ -185,7 +185,7 @@ class TestE2EOfLLDP:
     def test_030_change_polling_interval(self):
         """ Test if changing the polling interval works works properly. """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        wait_topology_ready(self.net)
 
         default_polling_time = 3
         api_url = KYTOS_API + '/of_lldp/v1/polling_time'
@@ -1,10 +1,10 @@
 import json
 import requests
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import wait_topology_ready
 import time
 
 CONTROLLER = "127.0.0.1"
-KYTOS_API = f"http://{CONTROLLER}:8181/api/kytos"
 
 # BasicFlows
 # Each should have at least 3 flows, considering topology 'ring4':
@@ -18,14 +18,14 @@ class TestE2EOfLLDP:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = cls.network_pool.acquire(CONTROLLER)
         cls.net.start()
         cls.net.wait_switches_connect()
         time.sleep(10)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def setup_method(self, method):
         """
@@ -33,7 +33,7 @@ class TestE2EOfLLDP:
         """
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
     def restart(self, clean_config=False, enable_all=True, wait_for=10):
         self.net.start_controller(clean_config=clean_config, enable_all=enable_all)
@@ -1,9 +1,9 @@
 import requests
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import wait_topology_ready
 import time
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
 
 
 class TestE2EOfLLDPLoopDetection:
@@ -11,15 +11,15 @@ class TestE2EOfLLDPLoopDetection:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name='looped')
+        cls.net = cls.network_pool.acquire(CONTROLLER, topo_name='looped')
         cls.net.start()
         cls.net.start_controller(clean_config=True, enable_all=True)
         cls.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def restart(self, _clean_config=False, _enable_all=False):
 
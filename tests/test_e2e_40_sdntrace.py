@@ -1,10 +1,11 @@
+import pytest
 import requests
-from tests.helpers import NetworkTest
+from tests.workers import API_URL
+from tests.waiters import wait_evc_deployed, wait_topology_ready
 import time
 import random
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api' % CONTROLLER
 
 
 class TestE2ESDNTrace:
@@ -13,26 +14,28 @@ class TestE2ESDNTrace:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name='linear10')
+        cls.net = cls.network_pool.acquire(CONTROLLER, topo_name='linear10')
         cls.net.start()
         cls.net.restart_kytos_clean()
         cls.net.wait_switches_connect()
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def setup_method(self, method):
         """
         It is called at the beginning of each method execution
         """
-        self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
-        circuit_id = self.create_evc(400)
-        time.sleep(10)
-        self.circuit = self.wait_until_evc_is_active(circuit_id)
+        self.net.restart_kytos_if_mutated(settle=self.create_circuit)
 
+    @classmethod
+    def create_circuit(cls):
+        """Create the EVC traced by the tests."""
+        wait_topology_ready(cls.net)
+        circuit_id = cls.create_evc(400)
+        wait_evc_deployed(cls.net, circuit_id)
+        cls.circuit = cls.wait_until_evc_is_active(circuit_id)
 
     @staticmethod
     def create_evc(vlan_id, interface_a="00:00:00:00:00:00:00:01:1", interface_z="00:00:00:00:00:00:00:0a:1"):
@@ -49,7 +52,7 @@ class TestE2ESDNTrace:
                 "tag": {"tag_type": "vlan", "value": vlan_id}
             }
         }
-        api_url = KYTOS_API + '/kytos/mef_eline/v2/evc/'
+        api_url = API_URL + '/kytos/mef_eline/v2/evc/'
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
         data = response.json()
@@ -57,7 +60,7 @@ class TestE2ESDNTrace:
 
     @staticmethod
     def get_evc(circuit_id):
-        api_url = KYTOS_API + '/kytos/mef_eline/v2/evc/'
+        api_url = API_URL + '/kytos/mef_eline/v2/evc/'
         response = requests.get(api_url+circuit_id)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -77,6 +80,7 @@ class TestE2ESDNTrace:
         else:
             raise ValueError(f"TimeoutError: {evc_id} didn't get active. {evc}")
 
+    @pytest.mark.readonly
     def test_001_run_sdntrace_cp(self):
         """Run SDNTrace-CP (Control Plane)."""
         # Trace from UNI_A
@@ -86,7 +90,7 @@ class TestE2ESDNTrace:
                 "eth": {"dl_type": 33024, "dl_vlan": 400}
             }
         }
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/trace'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/trace'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -117,7 +121,7 @@ class TestE2ESDNTrace:
                 "eth": {"dl_type": 33024, "dl_vlan": 400}
             }
         }
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/trace'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/trace'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -146,7 +150,7 @@ class TestE2ESDNTrace:
         wait_count = 0
         while wait_count < timeout:
             try:
-                api_url = KYTOS_API + '/amlight/sdntrace/trace'
+                api_url = API_URL + '/amlight/sdntrace/trace'
                 response = requests.get(f"{api_url}/{trace_id}")
                 data = response.json()
                 assert data["result"][-1]["reason"] == "done"
@@ -159,6 +163,7 @@ class TestE2ESDNTrace:
             raise Exception(msg)
         return data["result"]
 
+    @pytest.mark.readonly
     def test_010_run_sdntrace(self):
         """Run SDNTrace (Data Plane trace)."""
         # Trace from UNI_A
@@ -186,7 +191,7 @@ class TestE2ESDNTrace:
             }
         }
 
-        api_url = KYTOS_API + '/amlight/sdntrace/trace'
+        api_url = API_URL + '/amlight/sdntrace/trace'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -233,7 +238,7 @@ class TestE2ESDNTrace:
             }
         }
 
-        api_url = KYTOS_API + '/amlight/sdntrace/trace'
+        api_url = API_URL + '/amlight/sdntrace/trace'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -272,7 +277,7 @@ class TestE2ESDNTrace:
             ]
         }
 
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:05'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:05'
         response = requests.delete(api_url, json=delete_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
@@ -284,7 +289,7 @@ class TestE2ESDNTrace:
                 "eth": {"dl_type": 33024, "dl_vlan": 400}
             }
         }
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/trace'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/trace'
         response = requests.put(api_url, json=payload_1)
         data = response.json()
         # only 4 steps are expected: starting, 1->2, 2->3, 3->4
@@ -332,7 +337,7 @@ class TestE2ESDNTrace:
             }
         }
 
-        api_url = KYTOS_API + '/amlight/sdntrace/trace'
+        api_url = API_URL + '/amlight/sdntrace/trace'
         response = requests.put(api_url, json=payload_2)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -355,13 +360,13 @@ class TestE2ESDNTrace:
 
         # 4. redeploy evc and check again
         circuit_id = self.circuit['id']
-        api_url = KYTOS_API + '/kytos/mef_eline/v2/evc'
+        api_url = API_URL + '/kytos/mef_eline/v2/evc'
         response = requests.patch(f"{api_url}/{circuit_id}/redeploy")
         assert response.status_code == 202, response.text
         time.sleep(10)
         self.circuit = self.wait_until_evc_is_active(circuit_id)
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/trace'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/trace'
         response = requests.put(api_url, json=payload_1)
         data = response.json()
         assert len(data["result"]) == 10, data
@@ -379,7 +384,7 @@ class TestE2ESDNTrace:
         ]
         assert expected == actual, f"Expected {expected}. Actual: {actual}"
 
-        api_url = KYTOS_API + '/amlight/sdntrace/trace'
+        api_url = API_URL + '/amlight/sdntrace/trace'
         response = requests.put(api_url, json=payload_2)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -445,7 +450,7 @@ class TestE2ESDNTrace:
                     }
                 ]
                 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -487,7 +492,7 @@ class TestE2ESDNTrace:
                 }
             ]
         }
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
@@ -508,7 +513,7 @@ class TestE2ESDNTrace:
                 }
             ]
         }
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:02'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:02'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
@@ -523,7 +528,7 @@ class TestE2ESDNTrace:
                 }
                 ]
             }
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:03'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:03'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
@@ -542,7 +547,7 @@ class TestE2ESDNTrace:
                     }
                 ]
                 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -569,12 +574,12 @@ class TestE2ESDNTrace:
                 }
             ]
         }
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
         # Add a flow in S2: 
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:02'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:02'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
@@ -593,7 +598,7 @@ class TestE2ESDNTrace:
                     }
                 ]
                 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -623,7 +628,7 @@ class TestE2ESDNTrace:
                 }
             ]
         }
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
@@ -641,7 +646,7 @@ class TestE2ESDNTrace:
                     }
                 ]
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -681,7 +686,7 @@ class TestE2ESDNTrace:
                 }
             ]
         }
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
@@ -717,12 +722,12 @@ class TestE2ESDNTrace:
                 }
             ]
         }
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:02'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:02'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -765,7 +770,7 @@ class TestE2ESDNTrace:
                 }
             ]
         }
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
@@ -784,7 +789,7 @@ class TestE2ESDNTrace:
                     }
                 ]
                 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -808,7 +813,7 @@ class TestE2ESDNTrace:
                     }
         ]
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -819,7 +824,7 @@ class TestE2ESDNTrace:
         assert list_results[0][0]["port"] == 1
         assert list_results[0][-1]["type"] == "last"
 
-        api_url = KYTOS_API + '/amlight/sdntrace/trace'
+        api_url = API_URL + '/amlight/sdntrace/trace'
         response = requests.put(api_url, json=payload[0])
         assert response.status_code == 200, response.text
         data = response.json()
@@ -853,7 +858,7 @@ class TestE2ESDNTrace:
                     }
                 ]
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -863,7 +868,7 @@ class TestE2ESDNTrace:
         assert list_results[0][0]["port"] == 1
         assert list_results[0][-1]["type"] == "last"
 
-        api_url = KYTOS_API + '/amlight/sdntrace/trace'
+        api_url = API_URL + '/amlight/sdntrace/trace'
         response = requests.put(api_url, json=payload[0])
         assert response.status_code == 200, response.text
         data = response.json()
@@ -877,6 +882,7 @@ class TestE2ESDNTrace:
         assert result[0]["type"] == "starting"
         assert result[1]["dpid"] == "00:00:00:00:00:00:00:03"
 
+    @pytest.mark.readonly
     def test_080_validate_attribute_on_payload(self):
         "Validate parameters"
 
@@ -893,7 +899,7 @@ class TestE2ESDNTrace:
                         }
                     }               ]
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 400, response.text
 
@@ -901,7 +907,7 @@ class TestE2ESDNTrace:
         payload[0]['trace']['switch']['in_port'] = 3
         payload[0]['trace']['switch']['dpid'] = 1
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 400, response.text
 
@@ -909,14 +915,14 @@ class TestE2ESDNTrace:
         payload[0]['trace']['switch']['dpid'] = "00:00:00:00:00:00:00:01"
         payload[0]['trace']['eth']['dl_vlan'] = "10"
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 400, response.text
 
         # dl_vlan out of range (should be in [1, 4095]):
         payload[0]['trace']['eth']['dl_vlan'] = 4096
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 400, response.text
  
@@ -924,14 +930,14 @@ class TestE2ESDNTrace:
         payload[0]['trace']['eth']['dl_vlan'] = 10
         payload[0]['trace']['eth']['dl_type'] = "1"
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 400, response.text
  
         # Valid request:
         payload[0]['trace']['eth']['dl_type'] = 1
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200
 
@@ -950,7 +956,7 @@ class TestE2ESDNTrace:
                     "interface_id": "00:00:00:00:00:00:00:03:3"
                 }
             }
-        api_url = KYTOS_API + '/kytos/mef_eline/v2/evc/'
+        api_url = API_URL + '/kytos/mef_eline/v2/evc/'
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
         
@@ -973,7 +979,7 @@ class TestE2ESDNTrace:
                     }               
                 ]
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         results = response.json()['result']
@@ -1013,7 +1019,7 @@ class TestE2ESDNTrace:
                 }
             ]
         }
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
@@ -1032,7 +1038,7 @@ class TestE2ESDNTrace:
                     }
                 ]
                 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()["result"][0][0]
@@ -1064,7 +1070,7 @@ class TestE2ESDNTrace:
             }}
         ]
 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()["result"]
@@ -2,11 +2,10 @@ import os
 import time
 import shutil
 import requests
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
 from kytos.core.auth import UserController
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
 
 
 class TestE2EKytosAuth:
@@ -32,12 +31,12 @@ class TestE2EKytosAuth:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = cls.network_pool.acquire(CONTROLLER)
         cls.net.start()
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def get_token(self):
         api_url = KYTOS_API + '/core/auth/login/'
@@ -1,9 +1,9 @@
 import requests
-from tests.helpers import NetworkTest
+from tests.workers import API_URL
+from tests.waiters import wait_topology_ready
 import time
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api' % CONTROLLER
 
 
 class TestE2ESDNTrace:
@@ -12,14 +12,14 @@ class TestE2ESDNTrace:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name='amlight_looped')
+        cls.net = cls.network_pool.acquire(CONTROLLER, topo_name='amlight_looped')
         cls.net.start()
         cls.net.restart_kytos_clean()
         cls.net.wait_switches_connect()
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def setup_method(self, method):
         """
@@ -27,7 +27,7 @@ class TestE2ESDNTrace:
         """
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
     def test_001_run_sdntrace_with_goto_table_intra(cls):
         """Run SDNTrace-CP for instruction type goto_table for the intra case:
@@ -169,7 +169,7 @@ class TestE2ESDNTrace:
                 }
             ]
         }
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:11'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:11'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
@@ -191,7 +191,7 @@ class TestE2ESDNTrace:
                 }}
         ]
                 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -320,7 +320,7 @@ class TestE2ESDNTrace:
                 }
             ]
         }
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:11'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:11'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
@@ -418,7 +418,7 @@ class TestE2ESDNTrace:
                 }
             ]
         }
-        api_url = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:18'
+        api_url = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:18'
         response = requests.post(api_url, json = payload_stored_flow)
         assert response.status_code == 202, response.text
         time.sleep(10)
@@ -440,7 +440,7 @@ class TestE2ESDNTrace:
                 }}
         ]
                 
-        api_url = KYTOS_API + '/amlight/sdntrace_cp/v1/traces'
+        api_url = API_URL + '/amlight/sdntrace_cp/v1/traces'
         response = requests.put(api_url, json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
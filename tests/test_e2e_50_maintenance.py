@@ -1,13 +1,13 @@
 import json
 import time
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 import requests
 
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import wait_evc_deployed, wait_topology_ready
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api/kytos' % CONTROLLER
 
 TIME_FMT = "%Y-%m-%dT%H:%M:%S+0000"
 
@@ -23,15 +23,15 @@ class TestE2EMaintenance:
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER, topo_name="ring")
+        cls.net = cls.network_pool.acquire(CONTROLLER, topo_name="ring")
         cls.net.start()
         cls.net.restart_kytos_clean()
         cls.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     @staticmethod
     def get_evc(circuit_id):
@@ -76,9 +76,9 @@ class TestE2EMaintenance:
 
     def restart_and_create_circuit(self):
         self.net.restart_kytos_clean()
-        time.sleep(10)
+        wait_topology_ready(self.net)
         evc_id = self.create_circuit(100)
-        time.sleep(10)
+        wait_evc_deployed(self.net, evc_id)
         return evc_id
 
     def test_005_list_mw_should_be_empty(self):
@@ -144,7 +144,7 @@ class TestE2EMaintenance:
         # Sets up the maintenance window information
         mw_start_delay = 10
         mw_duration = 20
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -166,7 +166,7 @@ class TestE2EMaintenance:
         During the maintenance the EVC should steer away from sw_mw
         Ping should still work
         """
-        time.sleep(mw_start_delay + mw_duration / 2)
+        self.net.controller_sleep(mw_start_delay + mw_duration / 2)
 
         data = self.get_evc(evc_id)
         assert data["current_path"], data["current_path"]
@@ -182,7 +182,7 @@ class TestE2EMaintenance:
         assert '0 received' not in result
 
         # Waits for the MW to finish and check if the path returns to the initial configuration
-        time.sleep(mw_duration + 10)
+        self.net.controller_sleep(mw_duration + 10)
         data = self.get_evc(evc_id)
         assert data["current_path"], data["current_path"]
         current_path_sws = set()
@@ -217,12 +217,12 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1 on POST
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        wait_topology_ready(self.net)
 
         # Sets up the maintenance window information
         mw_start_delay = 60
         mw_duration = 60
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up a wrong maintenance window data
@@ -247,12 +247,12 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1 on POST
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        wait_topology_ready(self.net)
 
         # Sets up the maintenance window information
         mw_start_delay = 60
         mw_duration = 60
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up a wrong maintenance window data
@@ -275,12 +275,12 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1 on POST
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        wait_topology_ready(self.net)
 
         # Sets up the maintenance window information
         mw_start_delay = 60
         mw_duration = 60
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up a wrong maintenance window data
@@ -302,7 +302,7 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1 on POST
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        wait_topology_ready(self.net)
 
         # Sets up a wrong maintenance window data
         payload = {}
@@ -326,7 +326,7 @@ class TestE2EMaintenance:
         # Sets up the maintenance window information
         mw_start_delay = 60
         mw_duration = 60
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -380,7 +380,7 @@ class TestE2EMaintenance:
         assert json_data['end'] == new_time.strftime(TIME_FMT)
 
         # Waits for the MW to start
-        time.sleep(mw_start_delay + 5)
+        self.net.controller_sleep(mw_start_delay + 5)
 
         # Verifies the flow behavior during the maintenance
         s2 = self.net.net.get('s2')
@@ -400,7 +400,7 @@ class TestE2EMaintenance:
         assert ', 0% packet loss,' in result
 
         # Waits for the MW to finish and check if the path returns to the initial configuration
-        time.sleep(mw_duration + mw_new_end_time + 5)
+        self.net.controller_sleep(mw_duration + mw_new_end_time + 5)
 
         # Verifies the flows behavior after the maintenance
         flows_s2 = s2.dpctl('dump-flows')
@@ -418,14 +418,14 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1/{mw_id} on PATCH
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        wait_topology_ready(self.net)
 
         mw_id = "c16f5bbc4d004f018a76b22f677f8c2a"
 
         mw_start_delay = 60
         mw_duration = 60
 
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -453,7 +453,7 @@ class TestE2EMaintenance:
         # Sets up the maintenance window information
         mw_start_delay = 60
         mw_duration = 60
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -504,7 +504,7 @@ class TestE2EMaintenance:
         # Sets up the maintenance window information
         mw_start_delay = 60
         mw_duration = 60
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -549,13 +549,13 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1/{mw_id} on PATCH
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        wait_topology_ready(self.net)
 
         # Sets up the maintenance window information
         mw_start_delay = 60
         mw_duration = 60
 
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -595,13 +595,13 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1/{mw_id} on PATCH
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        wait_topology_ready(self.net)
 
         # Sets up maintenance window information
         mw_start_delay = 60
         mw_duration = 60
         mw_new_end_time = 30
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up a maintenance window data
@@ -643,7 +643,7 @@ class TestE2EMaintenance:
         }
 
         # Waits for the MW to start
-        time.sleep(mw_start_delay + 5)
+        self.net.controller_sleep(mw_start_delay + 5)
 
         # Updates a running maintenance
         mw_api_url = KYTOS_API + '/maintenance/v1/' + mw_id
@@ -663,7 +663,7 @@ class TestE2EMaintenance:
         # Sets up the maintenance window information
         mw_start_delay = 30
         mw_duration = 90
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -717,7 +717,7 @@ class TestE2EMaintenance:
 
         # Waits for the initial MW begin time
         # (no MW, it has been changed)
-        time.sleep(mw_start_delay + 5)
+        self.net.controller_sleep(mw_start_delay + 5)
 
         s2 = self.net.net.get('s2')
         h11, h3 = self.net.net.get('h11', 'h3')
@@ -736,7 +736,7 @@ class TestE2EMaintenance:
         assert ', 0% packet loss,' in result
 
         # Waits for the time in which MW will be running
-        time.sleep(mw_start_delay + 5)
+        self.net.controller_sleep(mw_start_delay + 5)
 
         # Verifies the flow during maintenance time
         flows_s2 = s2.dpctl('dump-flows')
@@ -746,7 +746,7 @@ class TestE2EMaintenance:
         assert ', 0% packet loss,' in result
 
         # Waits for the MW to finish and check if the path returns to the initial configuration
-        time.sleep(mw_duration)
+        self.net.controller_sleep(mw_duration)
 
         # Verifies the flow behavior after the maintenance window
         flows_s2 = s2.dpctl('dump-flows')
@@ -772,7 +772,7 @@ class TestE2EMaintenance:
         # Sets up the maintenance window information
         mw_start_delay = 60
         mw_duration = 60
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -792,7 +792,7 @@ class TestE2EMaintenance:
         mw_id = json_data["mw_id"]
 
         # Waits for the MW to start
-        time.sleep(mw_start_delay + 5)
+        self.net.controller_sleep(mw_start_delay + 5)
 
         # Deletes running maintenance by its id
         api_url = KYTOS_API + '/maintenance/v1/' + mw_id
@@ -811,7 +811,7 @@ class TestE2EMaintenance:
         # Sets up the maintenance window information
         mw_start_delay = 60
         mw_duration = 60
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -840,7 +840,7 @@ class TestE2EMaintenance:
         assert req.status_code == 404
 
         # Waits for the time in which the MW should start (but it is deleted)
-        time.sleep(mw_start_delay + 5)
+        self.net.controller_sleep(mw_start_delay + 5)
 
         s2 = self.net.net.get('s2')
         h11, h3 = self.net.net.get('h11', 'h3')
@@ -868,7 +868,7 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1/{mw_id} on DELETE
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        wait_topology_ready(self.net)
 
         mw_id = "c16f5bbc4d004f018a76b22f677f8c2a"
 
@@ -883,7 +883,7 @@ class TestE2EMaintenance:
         # Sets up the maintenance window information
         mw_start_delay = 30
         mw_duration = 60
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -912,7 +912,7 @@ class TestE2EMaintenance:
         assert json_data['id'] == mw_id
 
         # Waits for the MW to start
-        time.sleep(mw_start_delay + 5)
+        self.net.controller_sleep(mw_start_delay + 5)
 
         # Verifies the flow behavior during the maintenance
         s2 = self.net.net.get('s2')
@@ -955,7 +955,7 @@ class TestE2EMaintenance:
             /api/kytos/maintenance/v1/{mw_id}/end on PATCH
         """
         self.net.restart_kytos_clean()
-        time.sleep(5)
+        wait_topology_ready(self.net)
 
         mw_id = "c16f5bbc4d004f018a76b22f677f8c2a"
 
@@ -976,7 +976,7 @@ class TestE2EMaintenance:
         # Sets up the maintenance window information
         mw_start_delay = 60
         mw_duration = 60
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -1012,7 +1012,7 @@ class TestE2EMaintenance:
         mw_start_delay = 30
         mw_duration = 60
         mw_extension = 1
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -1041,7 +1041,7 @@ class TestE2EMaintenance:
         assert json_data['id'] == mw_id
 
         # Waits for the MW to start
-        time.sleep(mw_start_delay + 5)
+        self.net.controller_sleep(mw_start_delay + 5)
 
         # Verifies the flow behavior during the maintenance
         s2 = self.net.net.get('s2')
@@ -1068,7 +1068,7 @@ class TestE2EMaintenance:
         assert response.status_code == 200, response.text
 
         # Waits to the time that the MW should be ended but instead will be running (extended)
-        time.sleep(mw_duration + 5)
+        self.net.controller_sleep(mw_duration + 5)
 
         # Verifies the flow behavior during the maintenance
         s2 = self.net.net.get('s2')
@@ -1088,7 +1088,7 @@ class TestE2EMaintenance:
         assert ', 0% packet loss,' in result
 
         # Waits for the MW to finish and check if the path returns to the initial configuration
-        time.sleep(mw_extension*60)
+        self.net.controller_sleep(mw_extension*60)
 
         # Verifies the flows behavior after the maintenance
         flows_s2 = s2.dpctl('dump-flows')
@@ -1107,7 +1107,7 @@ class TestE2EMaintenance:
         mw_start_delay = 30
         mw_duration = 60
         mw_extension = 30
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -1155,7 +1155,7 @@ class TestE2EMaintenance:
         mw_start_delay = 30
         mw_duration = 60
         mw_extension = 1
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -1177,7 +1177,7 @@ class TestE2EMaintenance:
         mw_id = data["mw_id"]
 
         # Waits for the MW to start
-        time.sleep(mw_start_delay + 5)
+        self.net.controller_sleep(mw_start_delay + 5)
 
         payload2 = {'second': mw_extension}
 
@@ -1193,7 +1193,7 @@ class TestE2EMaintenance:
         mw_start_delay = 30
         mw_duration = 30
         mw_extension = 1
-        start = datetime.utcnow() + timedelta(seconds=mw_start_delay)
+        start = self.net.controller_now() + timedelta(seconds=mw_start_delay)
         end = start + timedelta(seconds=mw_duration)
 
         # Sets up the maintenance window data
@@ -1215,7 +1215,7 @@ class TestE2EMaintenance:
         mw_id = data["mw_id"]
 
         # Waits for the MW to start
-        time.sleep(mw_start_delay + mw_duration + 5)
+        self.net.controller_sleep(mw_start_delay + mw_duration + 5)
 
         payload2 = {'minutes': mw_extension}
 
@@ -1227,9 +1227,9 @@ class TestE2EMaintenance:
     def test_125_multiple_payload_item_filtering(self):
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
-        start = datetime.utcnow() + timedelta(days=1)
+        start = self.net.controller_now() + timedelta(days=1)
         end = start + timedelta(hours=2)
         payload = {
             "start": start.strftime(TIME_FMT),
@@ -1265,9 +1265,9 @@ class TestE2EMaintenance:
     def test_130_switch_payload_filtering(self):
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
-        start = datetime.utcnow() + timedelta(days=1)
+        start = self.net.controller_now() + timedelta(days=1)
         end = start + timedelta(hours=2)
         payload = {
             "start": start.strftime(TIME_FMT),
@@ -1294,9 +1294,9 @@ class TestE2EMaintenance:
     def test_135_interface_payload_filtering(self):
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
-        start = datetime.utcnow() + timedelta(days=1)
+        start = self.net.controller_now() + timedelta(days=1)
         end = start + timedelta(hours=2)
         payload = {
             "start": start.strftime(TIME_FMT),
@@ -1323,13 +1323,13 @@ class TestE2EMaintenance:
     def test_140_link_payload_filtering(self):
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
 
         api_url = KYTOS_API + '/topology/v3/switches'
         response = requests.get(api_url, headers={'Content-type': 'application/json'})
         print(response.json())
 
-        start = datetime.utcnow() + timedelta(days=1)
+        start = self.net.controller_now() + timedelta(days=1)
         end = start + timedelta(hours=2)
         payload = {
             "start": start.strftime(TIME_FMT),
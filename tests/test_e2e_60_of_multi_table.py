@@ -1,10 +1,10 @@
 import time
 
-from tests.helpers import NetworkTest
+from tests.workers import KYTOS_API
+from tests.waiters import wait_topology_ready
 import requests
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = f'http://{CONTROLLER}:8181/api/kytos'
 OF_MULTI_TABLE_API = '/of_multi_table/v1/pipeline'
 
 BASIC_FLOWS = 3
@@ -13,20 +13,19 @@ class TestE2EOfMultiTable:
 
     def setup_method(self, method):
         """Called at the beginning of each class method"""
-        self.net.start_controller(clean_config=True, enable_all=True)
-        self.net.wait_switches_connect()
-        time.sleep(10)
+        self.net.restart_kytos_baseline()
+        wait_topology_ready(self.net)
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = cls.network_pool.acquire(CONTROLLER)
         cls.net.start()
         cls.net.restart_kytos_clean()
-        time.sleep(10)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def restart(self, _clean_config=False, _enable_all=True):
         self.net.start_controller(clean_config=_clean_config, enable_all=_enable_all)
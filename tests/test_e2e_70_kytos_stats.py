@@ -1,31 +1,36 @@
 import time
 import json
 
-from tests.helpers import NetworkTest
+import pytest
+
+from tests.workers import API_URL
+from tests.waiters import wait_stats_collected, wait_topology_ready
 import requests
 
 CONTROLLER = '127.0.0.1'
-KYTOS_API = 'http://%s:8181/api' % CONTROLLER
-KYTOS_STATS = KYTOS_API + '/amlight/kytos_stats/v1'
+KYTOS_STATS = API_URL + '/amlight/kytos_stats/v1'
 
+@pytest.mark.timer_profile('fast-stats')
 class TestE2EKytosStats:
     
     def setup_method(self, method):
         """Called at the beginning of each class method"""
         self.net.start_controller(clean_config=True, enable_all=True)
         self.net.wait_switches_connect()
-        time.sleep(10)
+        wait_topology_ready(self.net)
+        # of_core.STATS_INTERVAL, much longer without the fast-stats profile
+        wait_stats_collected(self.net)
 
     @classmethod
     def setup_class(cls):
-        cls.net = NetworkTest(CONTROLLER)
+        cls.net = cls.network_pool.acquire(CONTROLLER)
         cls.net.start()
         cls.net.restart_kytos_clean()
-        time.sleep(10)
+        wait_topology_ready(cls.net)
 
     @classmethod
     def teardown_class(cls):
-        cls.net.stop()
+        cls.network_pool.release(cls.net)
 
     def test_005_flow_stats(self):
         """Test flow_stats"""
@@ -50,7 +55,7 @@ class TestE2EKytosStats:
         assert response.status_code == 200, response.text
         data = response.json()
 
-        api_url = KYTOS_API + '/kytos/topology/v3/switches'
+        api_url = API_URL + '/kytos/topology/v3/switches'
         response = requests.get(api_url)
         data_topp = response.json()
         assert len(data) == len(data_topp['switches'])
@@ -73,7 +78,7 @@ class TestE2EKytosStats:
         assert '00:00:00:00:00:00:00:01' in data, str(data)
         assert '00:00:00:00:00:00:00:02' in data, str(data)
 
-        api_url = KYTOS_API + '/kytos/topology/v3/switches'
+        api_url = API_URL + '/kytos/topology/v3/switches'
         response = requests.get(api_url)
         data_topp = response.json()
         topo_switches = data_topp['switches']
@@ -125,7 +130,7 @@ class TestE2EKytosStats:
             }]
         }
 
-        api_url_flow_manager = KYTOS_API + f'/kytos/flow_manager/v2/flows/{sw}'
+        api_url_flow_manager = API_URL + f'/kytos/flow_manager/v2/flows/{sw}'
         response = requests.post(api_url_flow_manager, data=json.dumps(payload),
                                  headers={'Content-type': 'application/json'})
         assert response.status_code == 202, response.text
@@ -177,7 +182,7 @@ class TestE2EKytosStats:
             }]
         }
 
-        api_url_flow_manager = KYTOS_API + f'/kytos/flow_manager/v2/flows/{sw}'
+        api_url_flow_manager = API_URL + f'/kytos/flow_manager/v2/flows/{sw}'
         response = requests.post(api_url_flow_manager, data=json.dumps(payload),
                                  headers={'Content-type': 'application/json'})
         assert response.status_code == 202, response.text
@@ -265,7 +270,7 @@ class TestE2EKytosStats:
         # install a flow
         payload = {"flows": [{"match": {"in_port": 1}}]}
 
-        api_url_flow_manager = KYTOS_API + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
+        api_url_flow_manager = API_URL + '/kytos/flow_manager/v2/flows/00:00:00:00:00:00:00:01'
         response = requests.post(api_url_flow_manager, data=json.dumps(payload),
                                  headers={'Content-type': 'application/json'})
         assert response.status_code == 202, response.text
@@ -304,7 +309,7 @@ class TestE2EKytosStats:
         # install a flow
         payload = {"flows": [{"table_id": 1, "match": {"in_port": 1}}]}
         sw = "00:00:00:00:00:00:00:01"
-        api_url_flow_manager = KYTOS_API + f'/kytos/flow_manager/v2/flows/{sw}'
+        api_url_flow_manager = API_URL + f'/kytos/flow_manager/v2/flows/{sw}'
         response = requests.post(api_url_flow_manager, data=json.dumps(payload),
                                  headers={'Content-type': 'application/json'})
         assert response.status_code == 202, response.text
@@ -0,0 +1,67 @@
+from tests.flows import DEFAULT_PRIORITY, evc_cookie, parse_dump_flows, parse_flow
+
+DUMP = (
+    'NXST_FLOW reply (xid=0x4):\r\n'
+    ' cookie=0xab00000000000001, duration=7.1s, table=0, n_packets=12, n_bytes=720,'
+    ' priority=50000,dl_src=ee:ee:ee:ee:ee:01 actions=CONTROLLER:65535\r\n'
+    ' cookie=0xaa0123456789abcd, duration=2.5s, table=0, n_packets=0, n_bytes=0,'
+    ' send_flow_rem priority=20000,in_port="s1-eth1",dl_vlan=102'
+    ' actions=mod_vlan_vid:103,output:"s1-eth3"\r\n'
+    ' cookie=0x0, duration=1.0s, table=2, n_packets=0, n_bytes=0,'
+    ' reset_counts check_overlap priority=100,arp actions=drop\r\n'
+)
+
+
+class TestFlowParser:
+
+    def test_flags_before_priority(self):
+        flow = parse_flow(
+            ' cookie=0x1, duration=1.5s, table=0, n_packets=0, n_bytes=0,'
+            ' send_flow_rem priority=20000,in_port=1 actions=output:2'
+        )
+        assert flow.priority == 20000
+        assert flow.match == {'in_port': 1}
+        assert flow.actions == 'output:2'
+
+    def test_several_flags(self):
+        flow = parse_flow(
+            ' cookie=0x0, duration=1.0s, table=0, n_packets=0, n_bytes=0,'
+            ' reset_counts no_packet_counts check_overlap priority=10,ip actions=drop'
+        )
+        assert flow.priority == 10
+        assert flow.match == {'ip': None}
+
+    def test_table_and_cookie(self):
+        flow = parse_flow(
+            ' cookie=0xaa0123456789abcd, duration=2.5s, table=3, n_packets=4,'
+            ' n_bytes=240, priority=100,in_port=1 actions=goto_table:4'
+        )
+        assert flow.table == 3
+        assert flow.cookie == 0xaa0123456789abcd
+        assert flow.counters == {'duration': 2.5, 'n_packets': 4, 'n_bytes': 240}
+
+    def test_defaults(self):
+        flow = parse_flow('in_port=1 actions=drop')
+        assert (flow.table, flow.priority, flow.cookie) == (0, DEFAULT_PRIORITY, 0)
+
+    def test_shorthand_matches(self):
+        flow = parse_flow('priority=100,ip,nw_dst=10.0.0.1 actions=output:2')
+        assert flow.match == {'ip': None, 'nw_dst': '10.0.0.1'}
+        flow = parse_flow('priority=100,arp,dl_vlan=101 actions=output:2')
+        assert flow.match == {'arp': None, 'dl_vlan': 101}
+
+    def test_quoted_port_names(self):
+        flow = parse_flow('priority=1,in_port="s1-eth1" actions=output:"s1-eth2"')
+        assert flow.match == {'in_port': 's1-eth1'}
+        assert flow.actions == 'output:"s1-eth2"'
+
+    def test_not_a_flow(self):
+        assert parse_flow('NXST_FLOW reply (xid=0x4):') is None
+
+    def test_dump_flows(self):
+        table = parse_dump_flows(DUMP)
+        assert len(table) == 3
+        assert len(table.by_cookie(evc_cookie('0123456789abcd'))) == 1
+        assert table.by_vlan(102)[0].priority == 20000
+        assert len(table.by_table(2)) == 1
+        assert table.by_table(2)[0].match == {'arp': None}
@@ -0,0 +1,96 @@
+"""Named timer profiles applied to the NApps settings per test class.
+
+kytos-init.sh installs the baseline settings the tests rely on. A class
+marked with @pytest.mark.timer_profile(name), or every class when the
+--timer-profile option is given, runs kytosd with the settings of that
+profile instead: they are written to the NApps settings.py files before the
+class starts kytosd, and the files are restored when another profile is
+selected or at the end of the session.
+"""
+import ast
+import os
+import re
+
+# {profile: {napp: {setting: value}}}
+PROFILES = {
+    'fast-stats': {
+        'of_core': {'STATS_INTERVAL': 3},
+    },
+    'fast-liveness': {
+        'topology': {'LINK_UP_TIMER': 1},
+        'of_lldp': {'LIVENESS_DEAD_MULTIPLIER': 2},
+    },
+    # the values shipped with the NApps, to measure real world convergence
+    'production-like': {
+        'of_core': {'STATS_INTERVAL': 60},
+        'topology': {'LINK_UP_TIMER': 10},
+        'mef_eline': {'DEPLOY_EVCS_INTERVAL': 60},
+        'flow_manager': {'CONSISTENCY_MIN_VERDICT_INTERVAL': 120},
+        'of_lldp': {'LIVENESS_DEAD_MULTIPLIER': 5},
+    },
+}
+
+
+class TimerProfiles:
+    """Apply and revert the profiles on the settings of the installed NApps."""
+
+    def __init__(self, napps_path=None):
+        if napps_path is None:
+            napps_path = (os.environ.get('NAPPS_PATH')
+                          or os.environ.get('VIRTUAL_ENV') or '/')
+        self.napps_path = napps_path
+        self.applied = None
+        # path -> content before the profile was applied
+        self.originals = {}
+
+    def settings_path(self, napp):
+        return os.path.join(self.napps_path, 'var/lib/kytos/napps/kytos',
+                            napp, 'settings.py')
+
+    def setting(self, napp, setting):
+        """Return the value of a setting of an installed NApp."""
+        path = self.settings_path(napp)
+        with open(path, 'r') as f:
+            match = re.search(r'^%s\s*=(.*)$' % setting, f.read(), flags=re.M)
+        if match is None:
+            raise Exception(f'{setting} not found in {path}')
+        return ast.literal_eval(match.group(1).strip())
+
+    def select(self, name):
+        """Make `name` (None for the baseline) the profile of the NApps."""
+        if name == self.applied:
+            return
+        if name is not None and name not in PROFILES:
+            raise Exception(f'unknown timer profile {name}, '
+                            f'expected one of {sorted(PROFILES)}')
+        self.revert()
+        if name is not None:
+            self.apply(name)
+
+    def apply(self, name):
+        for napp, settings in PROFILES[name].items():
+            path = self.settings_path(napp)
+            with open(path, 'r') as f:
+                content = f.read()
+            self.originals.setdefault(path, content)
+            for setting, value in settings.items():
+                content, count = re.subn(
+                    r'^%s\s*=.*$' % setting, '%s = %r' % (setting, value),
+                    content, flags=re.M,
+                )
+                if not count:
+                    raise Exception(f'{setting} not found in {path}')
+            with open(path, 'w') as f:
+                f.write(content)
+        self.applied = name
+        print(f"timer profile {name} applied")
+
+    def revert(self):
+        for path, content in self.originals.items():
+            with open(path, 'w') as f:
+                f.write(content)
+        self.originals = {}
+        self.applied = None
+
+
+TIMER_PROFILES = TimerProfiles()
@@ -0,0 +1,245 @@
+"""Waiters used to replace fixed time.sleep() calls in the tests.
+
+Each predicate below inspects the controller API or the switches once and
+returns a truthy value when the expected state was reached. The wait_*
+functions poll those predicates through wait_until(), which backs off
+exponentially and raises once the deadline passes.
+"""
+import time
+
+import requests
+
+from tests.flows import evc_cookie, parse_dump_flows
+from tests.workers import API_URL, KYTOS_API
+
+
+def wait_until(predicate, timeout=30, interval=0.05, max_interval=1,
+               backoff=2, msg=None):
+    """Poll predicate() until it returns a truthy value and return it.
+
+    The polling interval starts at `interval` seconds and is multiplied by
+    `backoff` after every miss, capped to `max_interval`.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        result = predicate()
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            msg = msg or getattr(predicate, '__name__', repr(predicate))
+            raise Exception('Timeout: timed out after %ss waiting for %s'
+                            % (timeout, msg))
+        time.sleep(min(interval, remaining))
+        interval = min(interval * backoff, max_interval)
+
+
+def _get_json(url):
+    """GET url and return its json content or None if not available."""
+    try:
+        response = requests.get(url, timeout=1)
+    except requests.exceptions.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+    return response.json()
+
+
+def dpid_from_switch(switch):
+    """Return the kytos representation of a mininet switch dpid."""
+    dpid = switch.dpid
+    return ':'.join(dpid[i:i + 2] for i in range(0, len(dpid), 2))
+
+
+def switch_links(net):
+    """Return the mininet links between two distinct switches which
+    have both interfaces up, i.e., the links LLDP is expected to find."""
+    switches = set(net.net.switches)
+    links = []
+    for link in net.net.links:
+        node1, node2 = link.intf1.node, link.intf2.node
+        if node1 not in switches or node2 not in switches or node1 is node2:
+            continue
+        if link.intf1.isUp() and link.intf2.isUp():
+            links.append(link)
+    return links
+
+
+def switches_listed(net, api=KYTOS_API):
+    """All mininet switches are listed on topology/v3/switches."""
+    data = _get_json(api + '/topology/v3/switches')
+    if not data:
+        return False
+    dpids = set(dpid_from_switch(sw) for sw in net.net.switches)
+    return dpids.issubset(data['switches'])
+
+
+def links_active(expected=None, api=KYTOS_API):
+    """All links in topology/v3/links are active and at least `expected`
+    links were found."""
+    data = _get_json(api + '/topology/v3/links')
+    if not data:
+        return False
+    links = data['links']
+    if expected is not None and len(links) < expected:
+        return False
+    return all(link['active'] for link in links.values())
+
+
+def interface_id(intf):
+    """Return the kytos interface id of a mininet switch interface."""
+    return '%s:%s' % (dpid_from_switch(intf.node), intf.node.ports[intf])
+
+
+def mininet_links_active(net, links, api=KYTOS_API):
+    """The switch-to-switch links among the given mininet links are all
+    active on topology/v3/links."""
+    data = _get_json(api + '/topology/v3/links')
+    if not data:
+        return False
+    active = set(
+        frozenset((link['endpoint_a']['id'], link['endpoint_b']['id']))
+        for link in data['links'].values() if link['active']
+    )
+    switches = set(net.net.switches)
+    for link in links:
+        if link.intf1.node not in switches or link.intf2.node not in switches:
+            continue
+        if frozenset((interface_id(link.intf1), interface_id(link.intf2))) not in active:
+            return False
+    return True
+
+
+def basic_flows_installed(net):
+    """Every switch has the LLDP flow and one coloring flow per
+    neighbor switch."""
+    neighbors = {sw: set() for sw in net.net.switches}
+    for link in switch_links(net):
+        neighbors[link.intf1.node].add(link.intf2.node)
+        neighbors[link.intf2.node].add(link.intf1.node)
+    for sw, peers in neighbors.items():
+        flows = sw.dpctl('dump-flows').strip().split('\r\n ')
+        if len([flow for flow in flows if 'cookie=' in flow]) < 1 + len(peers):
+            return False
+    return True
+
+
+def evc_active(evc_id, api=KYTOS_API):
+    """The EVC is enabled and active on mef_eline."""
+    data = _get_json(api + '/mef_eline/v2/evc/' + evc_id)
+    if not data:
+        return False
+    return data['enabled'] and data['active']
+
+
+def evc_protected(evc_id, api=KYTOS_API):
+    """The EVC is active with both a current and a failover path."""
+    data = _get_json(api + '/mef_eline/v2/evc/' + evc_id)
+    if not data:
+        return False
+    return data['active'] and bool(data['current_path']) and bool(data['failover_path'])
+
+
+def evc_flows_present(net, evc_id, switches=None, expected=None,
+                      api=KYTOS_API):
+    """The flows of the EVC are installed on each of the given switches,
+    which default to the switches of the EVC UNIs.
+
+    `expected` is the number of flows with the EVC cookie each switch must
+    have, e.g. 3 with the failover path, or {switch name: number} for
+    those switches; without it, one flow per switch is enough.
+    """
+    if switches is None and isinstance(expected, dict):
+        switches = list(expected)
+    if switches is None:
+        data = _get_json(api + '/mef_eline/v2/evc/' + evc_id)
+        if not data:
+            return False
+        dpids = set(data[uni]['interface_id'].rsplit(':', 1)[0]
+                    for uni in ('uni_a', 'uni_z'))
+        switches = [sw.name for sw in net.net.switches
+                    if dpid_from_switch(sw) in dpids]
+    cookie = evc_cookie(evc_id)
+    for name in switches:
+        sw = net.net.get(name)
+        count = len(parse_dump_flows(sw.dpctl('dump-flows')).by_cookie(cookie))
+        want = expected[name] if isinstance(expected, dict) else expected
+        if (want is None and not count) or (want is not None and count != want):
+            return False
+    return True
+
+
+def evc_path_avoids(net, evc_id, node1, node2, api=KYTOS_API):
+    """The current path of the EVC uses none of the links between the
+    mininet nodes node1 and node2, e.g. after they were set down."""
+    data = _get_json(api + '/mef_eline/v2/evc/' + evc_id)
+    if not data:
+        return False
+    avoided = set()
+    for link in net.net.linksBetween(net.net.get(node1), net.net.get(node2)):
+        avoided.update((interface_id(link.intf1), interface_id(link.intf2)))
+    used = set(hop[end]['id'] for hop in data['current_path']
+               for end in ('endpoint_a', 'endpoint_b'))
+    return not used & avoided
+
+
+def stats_collected(net, kind, api=API_URL):
+    """kytos_stats has `kind` ('flow' or 'table') stats of every mininet
+    switch, i.e., of_core finished a polling round."""
+    data = _get_json(api + f'/amlight/kytos_stats/v1/{kind}/stats')
+    if not data:
+        return False
+    return all(data.get(dpid_from_switch(sw)) for sw in net.net.switches)
+
+
+def wait_topology_ready(net, timeout=60, api=KYTOS_API):
+    """Wait for LLDP to discover every switch link as active and for the
+    basic flows (LLDP and coloring) to be installed on every switch."""
+    expected = len(switch_links(net))
+    wait_until(lambda: switches_listed(net, api), timeout=timeout,
+               msg='switches listed on topology')
+    wait_until(lambda: links_active(expected, api), timeout=timeout,
+               msg='%s active links on topology' % expected)
+    wait_until(lambda: basic_flows_installed(net), timeout=timeout,
+               msg='basic flows on switches')
+
+
+def wait_stats_collected(net, kinds=('flow', 'table'), timeout=60, api=API_URL):
+    """Wait until kytos_stats has the `kinds` stats of every switch."""
+    for kind in kinds:
+        wait_until(lambda: stats_collected(net, kind, api), timeout=timeout,
+                   msg='%s stats of every switch' % kind)
+
+
+def wait_links_active(net, links, timeout=30, api=KYTOS_API):
+    """Wait until the given mininet links, e.g. the ones returned by
+    NetworkTest.config_all_links_up(), are active on topology."""
+    wait_until(lambda: mininet_links_active(net, links, api), timeout=timeout,
+               msg='%s links to be active' % len(links))
+
+
+def wait_evc_deployed(net, evc_id, switches=None, expected=None, timeout=30,
+                      api=KYTOS_API):
+    """Wait until the EVC is active and its flows are on `switches`, see
+    evc_flows_present() for `expected`."""
+    wait_until(lambda: evc_active(evc_id, api), timeout=timeout,
+               msg='EVC %s to be active' % evc_id)
+    wait_until(lambda: evc_flows_present(net, evc_id, switches, expected, api),
+               timeout=timeout, msg='EVC %s flows' % evc_id)
+
+
+def wait_evc_removed(net, evc_id, switches=None, timeout=30, api=KYTOS_API):
+    """Wait until none of `switches` (all by default) has flows of the EVC,
+    e.g. after it was disabled or deleted."""
+    if switches is None:
+        switches = [sw.name for sw in net.net.switches]
+    wait_until(lambda: evc_flows_present(net, evc_id, switches, 0, api),
+               timeout=timeout, msg='EVC %s flows to be removed' % evc_id)
+
+
+def wait_evc_path_avoids(net, evc_id, node1, node2, timeout=30, api=KYTOS_API):
+    """Wait until the EVC moved away from the links between node1 and
+    node2, see evc_path_avoids()."""
+    wait_until(lambda: evc_path_avoids(net, evc_id, node1, node2, api),
+               timeout=timeout,
+               msg='EVC %s to leave the %s-%s links' % (evc_id, node1, node2))
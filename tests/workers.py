@@ -0,0 +1,67 @@
+"""Per-worker isolation settings, so the suite can run under pytest-xdist.
+
+Each xdist worker ("gw0", "gw1", ...) runs its own kytosd with distinct API
+and OpenFlow ports and its own Mongo database, and its Mininet switches
+listen on a distinct port range and are named with a two-character worker
+prefix ("w0s1", "w1s1", ..., "was1") so several workers can build the same topology at once. Without
+xdist the default values are used.
+"""
+import os
+
+WORKER_ID = os.environ.get('PYTEST_XDIST_WORKER', '')
+WORKER_INDEX = int(WORKER_ID[2:]) if WORKER_ID.startswith('gw') else 0
+ISOLATED = bool(WORKER_ID)
+
+API_PORT = 8181 + WORKER_INDEX
+OF_PORT = 6653 + 100 * WORKER_INDEX
+LISTEN_PORT_OFFSET = 100 * WORKER_INDEX
+
+# interface names ("<switch>-eth<port>") are limited to IFNAMSIZ - 1
+# characters, so the prefix is always two: "w" and the worker index in base 36
+IFNAME_MAX = 15
+PREFIX_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+if ISOLATED and WORKER_INDEX >= len(PREFIX_DIGITS):
+    raise Exception(f'At most {len(PREFIX_DIGITS)} pytest-xdist workers are supported')
+SWITCH_PREFIX = 'w' + PREFIX_DIGITS[WORKER_INDEX] if ISOLATED else ''
+
+MONGO_DBNAME = os.environ.get('MONGO_DBNAME')
+if ISOLATED and MONGO_DBNAME:
+    MONGO_DBNAME = f'{MONGO_DBNAME}_{WORKER_ID}'
+
+API_URL = 'http://127.0.0.1:%s/api' % API_PORT
+KYTOS_API = API_URL + '/kytos'
+
+
+def listen_port(port):
+    """Remap a switch listen port to the range of this worker."""
+    return port + LISTEN_PORT_OFFSET
+
+
+def switch_name(name):
+    """Return the name of a topology switch for this worker."""
+    return SWITCH_PREFIX + name
+
+
+def kytosd_args(base_env):
+    """Return the kytosd arguments which isolate this worker's instance."""
+    if not ISOLATED:
+        return []
+    return [
+        '--api_port', str(API_PORT),
+        '--port', str(OF_PORT),
+        '--pidfile', pid_path(base_env),
+    ]
+
+
+def kytosd_env():
+    """Return the environment for this worker's kytosd."""
+    env = dict(os.environ)
+    if MONGO_DBNAME:
+        env['MONGO_DBNAME'] = MONGO_DBNAME
+    return env
+
+
+def pid_path(base_env):
+    """Return the kytosd pid file of this worker."""
+    name = f'kytosd-{WORKER_ID}.pid' if ISOLATED else 'kytosd.pid'
+    return os.path.join(base_env, 'var/run/kytos', name)